@@ -0,0 +1,23 @@
+# benchmarks/bench_config.py
+
+from pushfolio import config
+
+
+def _write_config(settings):
+    config.save_config(settings)
+
+
+def bench_load_config_warm(benchmark, settings):
+    _write_config(settings)
+    loaded = benchmark(config.load_config)
+    assert loaded["github_username"] == "octocat"
+
+
+def bench_load_config_cold(benchmark, settings):
+    _write_config(settings)
+
+    def invalidate():
+        config._cache["stamp"] = None
+
+    loaded = benchmark.pedantic(config.load_config, setup=invalidate, rounds=200)
+    assert loaded["github_username"] == "octocat"
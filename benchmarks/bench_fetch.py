@@ -0,0 +1,13 @@
+# benchmarks/bench_fetch.py
+
+from pushfolio import fetch
+
+
+def bench_get_language_stats(benchmark, repos):
+    stats = benchmark(fetch.get_language_stats, repos)
+    assert sum(stats.values()) <= len(repos)
+
+
+def bench_get_top_starred_repo(benchmark, repos):
+    top = benchmark(fetch.get_top_starred_repo, repos)
+    assert top["stargazers_count"] == max(r["stargazers_count"] for r in repos)
@@ -0,0 +1,19 @@
+# benchmarks/bench_import.py
+
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def _import(module):
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT, check=True)
+
+
+def bench_python_startup(benchmark):
+    # Reference point: subtract this from the CLI import time
+    benchmark.pedantic(_import, args=("sys",), rounds=10, iterations=1)
+
+
+def bench_cli_import(benchmark):
+    benchmark.pedantic(_import, args=("pushfolio.cli",), rounds=10, iterations=1)
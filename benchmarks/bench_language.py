@@ -0,0 +1,21 @@
+# benchmarks/bench_language.py
+
+from pushfolio import language, store
+
+
+def bench_language_stats_cold(benchmark, mock_transport):
+    # Every repo misses the repo_languages cache and goes to the (mock) API
+    result = benchmark.pedantic(
+        language.get_language_stats, args=("octocat",),
+        setup=lambda: store.clear(["repo_languages"]), rounds=3, iterations=1
+    )
+    assert result
+
+
+def bench_language_stats_warm(benchmark, mock_transport):
+    # Repos are unchanged since the last call, so only the repo list is fetched
+    language.get_language_stats("octocat")
+    del mock_transport.calls[:]
+    result = benchmark(language.get_language_stats, "octocat")
+    assert result
+    assert not any(url.endswith("/languages") for url in mock_transport.calls)
@@ -0,0 +1,8 @@
+# benchmarks/bench_plugins.py
+
+from pushfolio.plugins import discover_plugins
+
+
+def bench_discover_plugins(benchmark):
+    plugins = benchmark(discover_plugins)
+    assert isinstance(plugins, list)
@@ -0,0 +1,20 @@
+# benchmarks/bench_render.py
+
+import os
+
+import pytest
+
+from pushfolio import fetch, markdown
+
+TEMPLATES = sorted(f for f in os.listdir(os.path.join(os.path.dirname(__file__), "..", "templates")) if f.endswith(".md"))
+
+
+@pytest.mark.parametrize("template", TEMPLATES)
+def bench_build_readme(benchmark, repos, user, settings, template):
+    settings["template"] = template
+    languages = fetch.get_language_stats(repos)
+    top_repo = fetch.get_top_starred_repo(repos)
+    latest_commit = {"commit": {"message": "Benchmark commit", "author": {"date": "2025-06-01T12:00:00Z"}}}
+
+    readme = benchmark(markdown.build_readme, user, repos, languages, top_repo, latest_commit, settings)
+    assert not readme.startswith("❌")
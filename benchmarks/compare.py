@@ -0,0 +1,147 @@
+# benchmarks/compare.py
+"""
+Performance regression gate for the pytest-benchmark suite.
+
+    pip install pytest pytest-benchmark
+    python -m pytest benchmarks --benchmark-json=bench.json
+
+    # Record the current numbers as the baseline (benchmarks/baseline.json)
+    python benchmarks/compare.py baseline bench.json
+
+    # Fail (exit 1) if anything got slower than the baseline by more than 20%
+    python benchmarks/compare.py check bench.json --threshold 20
+"""
+
+import json
+import os
+import sys
+from argparse import ArgumentParser
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+STATS = ("min", "median", "mean", "max", "stddev", "rounds")
+
+
+def load_results(path):
+    """{benchmark name: stats} from a pytest-benchmark --benchmark-json file or a saved baseline."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    benchmarks = data["benchmarks"]
+    if isinstance(benchmarks, dict):  # already a slim baseline
+        return benchmarks
+    return {
+        bench["name"]: {stat: bench["stats"][stat] for stat in STATS}
+        for bench in benchmarks
+    }
+
+
+def save_baseline(results_path, baseline_path=BASELINE_FILE):
+    with open(results_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    machine = data.get("machine_info", {})
+    baseline = {
+        # Timings only compare meaningfully on similar hardware; keep enough to tell
+        "machine": {
+            "python": machine.get("python_version"),
+            "system": machine.get("system"),
+            "cpu": (machine.get("cpu") or {}).get("brand_raw"),
+        },
+        "commit": (data.get("commit_info") or {}).get("id"),
+        "datetime": data.get("datetime"),
+        "benchmarks": load_results(results_path),
+    }
+    with open(baseline_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return len(baseline["benchmarks"])
+
+
+def compare(baseline, current, threshold=20.0, stat="median"):
+    """
+    Returns (rows, regressions). Each row is (name, old, new, change %, status);
+    status is "regressed", "improved", "ok", "new" or "missing".
+    """
+    rows = []
+    regressions = []
+    for name in sorted(set(baseline) | set(current)):
+        old = baseline.get(name, {}).get(stat)
+        new = current.get(name, {}).get(stat)
+        if old is None:
+            rows.append((name, None, new, None, "new"))
+            continue
+        if new is None:
+            rows.append((name, old, None, None, "missing"))
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        if change > threshold:
+            status = "regressed"
+            regressions.append(name)
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, old, new, change, status))
+    return rows, regressions
+
+
+def _fmt_time(seconds):
+    if seconds is None:
+        return "—"
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.2f} µs"
+
+
+def print_report(rows, stat, threshold, stream=None):
+    stream = stream or sys.stdout
+    width = max([len(row[0]) for row in rows] + [9])
+    stream.write(f"{'Benchmark':<{width}}  {'Baseline':>12}  {'Current':>12}  {'Change':>8}  Status\n")
+    for name, old, new, change, status in rows:
+        change_str = f"{change:+.1f}%" if change is not None else "—"
+        stream.write(f"{name:<{width}}  {_fmt_time(old):>12}  {_fmt_time(new):>12}  {change_str:>8}  {status}\n")
+    stream.write(f"\nCompared {stat} times; regression threshold {threshold:g}%.\n")
+
+
+def main(argv=None):
+    parser = ArgumentParser(prog="benchmarks/compare.py", description="Compare benchmark results against a baseline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    save = sub.add_parser("baseline", help="Save a --benchmark-json result as the baseline")
+    save.add_argument("results")
+    save.add_argument("--baseline", default=BASELINE_FILE)
+
+    check = sub.add_parser("check", help="Flag benchmarks that regressed beyond the threshold")
+    check.add_argument("results")
+    check.add_argument("--baseline", default=BASELINE_FILE)
+    check.add_argument("--threshold", type=float, default=20.0, help="Allowed slowdown in percent (default 20)")
+    check.add_argument("--stat", choices=("min", "median", "mean"), default="median")
+    check.add_argument("--allow-missing", action="store_true", help="Don't fail when a baseline benchmark didn't run")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "baseline":
+        count = save_baseline(args.results, args.baseline)
+        print(f"✅ Saved {count} benchmarks to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"❌ No baseline at {args.baseline}. Run `compare.py baseline <results.json>` first.", file=sys.stderr)
+        return 2
+
+    rows, regressions = compare(load_results(args.baseline), load_results(args.results), args.threshold, args.stat)
+    print_report(rows, args.stat, args.threshold)
+
+    missing = [row[0] for row in rows if row[4] == "missing"]
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) regressed by more than {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    if missing and not args.allow_missing:
+        print(f"❌ {len(missing)} baseline benchmark(s) didn't run: {', '.join(missing)}")
+        return 1
+    print("✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# benchmarks/conftest.py
+
+import json
+import os
+import random
+import shutil
+import sys
+
+import pytest
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from pushfolio import config, metrics, replay, store  # noqa: E402
+
+SIZES = (10, 1000, 10000)
+LANGUAGES = ("Python", "JavaScript", "TypeScript", "Go", "Rust", "Java", "C++", "Shell", "HTML", None)
+
+
+def make_repos(count, seed=42):
+    """Deterministic GitHub-shaped repo dicts (only the fields pushfolio reads)."""
+    rng = random.Random(seed)
+    repos = []
+    for i in range(count):
+        name = f"repo-{i}"
+        repos.append({
+            "name": name,
+            "full_name": f"octocat/{name}",
+            "html_url": f"https://github.com/octocat/{name}",
+            "description": f"Synthetic repo number {i}",
+            "language": rng.choice(LANGUAGES),
+            "stargazers_count": rng.randint(0, 5000),
+            "forks_count": rng.randint(0, 500),
+            "fork": rng.random() < 0.1,
+            "pushed_at": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+            "languages_url": f"https://api.github.com/repos/octocat/{name}/languages",
+        })
+    return repos
+
+
+@pytest.fixture(scope="session", params=SIZES, ids=lambda n: f"{n}-repos")
+def repos(request):
+    return make_repos(request.param)
+
+
+@pytest.fixture(scope="session")
+def user():
+    return {"login": "octocat", "name": "The Octocat", "bio": "Benchmarks.", "followers": 1234, "public_repos": 10000}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def workdir(tmp_path_factory):
+    """Run from a scratch dir so the config, state db and templates never touch the checkout."""
+    path = tmp_path_factory.mktemp("pushfolio-bench")
+    shutil.copytree(os.path.join(ROOT, "templates"), path / "templates")
+    previous = os.getcwd()
+    os.chdir(path)
+    metrics.start("benchmark")
+    yield path
+    store.close()
+    os.chdir(previous)
+
+
+@pytest.fixture
+def settings():
+    data = json.loads(json.dumps(config.DEFAULT_CONFIG))
+    data.update(github_username="octocat", show_charts=False, plugin_sandbox=False)
+    return data
+
+
+class MockTransport:
+    """Stands in for replay._http_get: canned responses, no sockets."""
+
+    def __init__(self, routes):
+        self.routes = {url: json.dumps(body).encode("utf-8") for url, body in routes.items()}
+        self.calls = []
+
+    def __call__(self, url, headers=None):
+        self.calls.append(url)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.routes.get(url, b"{}")
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+
+@pytest.fixture
+def mock_transport(monkeypatch, repos):
+    rng = random.Random(7)
+    routes = {"https://api.github.com/users/octocat/repos?per_page=100": repos}
+    for repo in repos:
+        routes[repo["languages_url"]] = {
+            lang: rng.randint(1000, 500000) for lang in rng.sample(LANGUAGES[:-1], 3)
+        }
+    transport = MockTransport(routes)
+    monkeypatch.setattr(replay, "_http_get", transport)
+    return transport
@@ -0,0 +1,148 @@
+# pushfolio/activity.py
+
+import heapq
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from rich.console import Console
+from . import fetch, store
+
+console = Console()
+
+EVENTS_PER_PAGE = 100
+MAX_EVENT_PAGES = 3  # GitHub only serves the latest 300 events
+DEFAULT_WEEKS = 12
+TOP_REPOS = 5
+
+
+def _commit_count(event):
+    if event.get("type") != "PushEvent":
+        return 0
+    payload = event.get("payload") or {}
+    return payload.get("size") or payload.get("distinct_size") or len(payload.get("commits") or [])
+
+
+def sync_events(username, token):
+    """
+    Pull only the events newer than the last sync into the local store.
+    Returns how many new events were stored.
+    """
+    last_id = store.latest_event_id(username) or 0
+    fresh = []
+
+    for page in range(1, MAX_EVENT_PAGES + 1):
+        url = f"https://api.github.com/users/{username}/events?per_page={EVENTS_PER_PAGE}&page={page}"
+        events = fetch.github_request(url, token)
+        new = [e for e in events if int(e["id"]) > last_id]
+        fresh.extend(
+            (int(e["id"]), e.get("type", ""), (e.get("repo") or {}).get("name"), e["created_at"], _commit_count(e))
+            for e in new
+        )
+        # Caught up with what we already have (or ran out of events)
+        if len(new) < len(events) or len(events) < EVENTS_PER_PAGE:
+            break
+
+    if fresh:
+        store.put_events(username, fresh)
+    return len(fresh)
+
+
+def load_columns(username, since=None):
+    """Events as parallel arrays (day ordinal, commits, repo index) plus the repo name table."""
+    days = array("l")
+    commits = array("l")
+    repo_idx = array("l")
+    repos = []
+    repo_lookup = {}
+
+    for _, repo, created_at, count in store.get_events(username, since):
+        days.append(datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%SZ").toordinal())
+        commits.append(count)
+        if repo not in repo_lookup:
+            repo_lookup[repo] = len(repos)
+            repos.append(repo)
+        repo_idx.append(repo_lookup[repo])
+
+    return {"days": days, "commits": commits, "repo_idx": repo_idx, "repos": repos}
+
+
+def _streaks(active, today):
+    longest = run = 0
+    previous = None
+    for day in sorted(active):
+        run = run + 1 if previous == day - 1 else 1
+        longest = max(longest, run)
+        previous = day
+
+    # The current streak may end yesterday if nothing has happened yet today
+    current = 0
+    day = today if today in active else today - 1
+    while day in active:
+        current += 1
+        day -= 1
+    return current, longest
+
+
+def _utc_today():
+    # Event timestamps are UTC; a local date could still be "yesterday" for them
+    return datetime.now(timezone.utc).date()
+
+
+def compute_stats(columns, weeks=DEFAULT_WEEKS, today=None):
+    today = (today or _utc_today()).toordinal()
+    # Ordinal 1 (0001-01-01) is a Monday, so this snaps to the start of the week
+    this_monday = today - (today - 1) % 7
+    first_monday = this_monday - 7 * (weeks - 1)
+
+    weekly = array("l", [0] * weeks)
+    repo_events = array("l", [0] * len(columns["repos"]))
+    repo_commits = array("l", [0] * len(columns["repos"]))
+    active = set()
+    total_commits = 0
+
+    for day, count, idx in zip(columns["days"], columns["commits"], columns["repo_idx"]):
+        if day > today:
+            # Dated after "today" (clock skew, or a caller passing a local date): no bucket for it
+            continue
+        active.add(day)
+        total_commits += count
+        repo_events[idx] += 1
+        repo_commits[idx] += count
+        if day >= first_monday:
+            weekly[(day - first_monday) // 7] += count
+
+    current, longest = _streaks(active, today)
+    top = heapq.nlargest(
+        TOP_REPOS,
+        range(len(columns["repos"])),
+        key=lambda i: (repo_commits[i], repo_events[i])
+    )
+
+    return {
+        "weekly_commits": [
+            {"week": date.fromordinal(first_monday + 7 * i).strftime("%d %b"), "commits": weekly[i]}
+            for i in range(weeks)
+        ],
+        "total_commits": total_commits,
+        "total_events": int(sum(repo_events)),
+        "active_days": len(active),
+        "current_streak": current,
+        "longest_streak": longest,
+        "top_repos": [
+            {"name": columns["repos"][i], "events": repo_events[i], "commits": repo_commits[i]}
+            for i in top if columns["repos"][i]
+        ],
+    }
+
+
+def get_activity(username, token, weeks=DEFAULT_WEEKS):
+    """Sync new events, then summarise the last ``weeks`` weeks for the templates."""
+    try:
+        sync_events(username, token)
+    except Exception as e:
+        # Stale-but-present history is still worth showing
+        console.print(f"[yellow]⚠️ Couldn't sync activity events: {e}[/yellow]")
+
+    today = _utc_today()
+    first_monday = today - timedelta(days=today.weekday() + 7 * (weeks - 1))
+    since = first_monday.strftime("%Y-%m-%dT00:00:00Z")
+    return compute_stats(load_columns(username, since), weeks, today)
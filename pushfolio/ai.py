@@ -1,12 +1,11 @@
 # pushfolio/ai.py
 
 import os
-import json
 from rich.console import Console
 from rich.prompt import Prompt
+from . import config, headless, replay, store
 
 console = Console()
-CACHE_FILE = ".pushfolio_cache.json"
 
 try:
     import openai
@@ -15,27 +14,25 @@ except ImportError:
 
 
 def get_cached_bio(username):
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, "r") as f:
-                data = json.load(f)
-                return data.get(username)
-        except:
-            pass
-    return None
+    try:
+        return store.get_bio(username)
+    except Exception:
+        return None
 
 
 def generate_bio(context):
     username = context.get("username", "developer")
 
-    if not openai:
-        console.print("[red]❌ OpenAI module is not installed. Install it with:[/red] [bold]pip install openai[/bold]")
-        return fallback_bio(context)
+    # 🎞️ Replayed responses need neither the module nor a key
+    if not replay.replaying():
+        if not openai:
+            console.print("[red]❌ OpenAI module is not installed. Install it with:[/red] [bold]pip install openai[/bold]")
+            return fallback_bio(context)
 
-    openai.api_key = os.getenv("OPENAI_API_KEY", "")
-    if not openai.api_key.strip() or "your" in openai.api_key.lower():
-        console.print("[red]❌ No valid OpenAI API key found[/red]")
-        return handle_ai_failure("Missing API key", context)
+        openai.api_key = os.getenv("OPENAI_API_KEY", "")
+        if not openai.api_key.strip() or "your" in openai.api_key.lower():
+            console.print("[red]❌ No valid OpenAI API key found[/red]")
+            return handle_ai_failure("Missing API key", context)
 
     cached_bio = get_cached_bio(username)
 
@@ -57,7 +54,8 @@ def generate_bio(context):
 
     for attempt in range(2):
         try:
-            response = openai.ChatCompletion.create(
+            response = replay.chat_completion(
+                openai.ChatCompletion.create if openai else None,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
@@ -66,16 +64,7 @@ def generate_bio(context):
             bio = response.choices[0].message.content.strip()
 
             # Cache it
-            data = {}
-            if os.path.exists(CACHE_FILE):
-                try:
-                    with open(CACHE_FILE, "r") as f:
-                        data = json.load(f)
-                except:
-                    pass
-            data[username] = bio
-            with open(CACHE_FILE, "w") as f:
-                json.dump(data, f, indent=2)
+            store.put_bio(username, bio)
 
             console.print("[green]✅ Generated new About Me using OpenAI and cached it[/green]")
             return bio
@@ -94,18 +83,30 @@ def fallback_bio(context):
     return fallback
 
 
+def _headless_ai_choice(error):
+    # 🤖 Headless runs follow the configured policy instead of asking
+    policy = headless.ai_failure_policy(config.load_config())
+    if policy == "fail":
+        headless.fail("ai_failed", f"AI bio generation failed: {error}")
+    return {"cached": "2", "fallback": "3", "skip": "4"}[policy]
+
 def handle_ai_failure(error, context, cached_bio=None):
     username = context.get("username", "developer")
 
-    choice = Prompt.ask(
-        "[yellow]What would you like to do?[/yellow]\n"
-        "[1] Re-enter OpenAI key\n"
-        "[2] Use cached About Me\n"
-        "[3] Use fallback About Me\n"
-        "[4] Skip About Me",
-        choices=["1", "2", "3", "4"],
-        default="3"
-    )
+    if headless.enabled():
+        choice = _headless_ai_choice(error)
+        if choice == "2" and not cached_bio:
+            cached_bio = get_cached_bio(username)
+    else:
+        choice = Prompt.ask(
+            "[yellow]What would you like to do?[/yellow]\n"
+            "[1] Re-enter OpenAI key\n"
+            "[2] Use cached About Me\n"
+            "[3] Use fallback About Me\n"
+            "[4] Skip About Me",
+            choices=["1", "2", "3", "4"],
+            default="3"
+        )
 
     if choice == "1":
         new_key = Prompt.ask("🔑 Enter your OpenAI API key")
@@ -0,0 +1,176 @@
+# pushfolio/charts.py
+
+import hashlib
+import json
+import math
+import os
+from html import escape
+from . import metrics, store
+from .output import atomic_write
+
+# Bump when the SVG layout changes so cached charts get re-rendered
+CHART_VERSION = 1
+MAX_LANGUAGES = 8
+
+LANGUAGE_COLORS = {
+    "Python": "#3572A5",
+    "JavaScript": "#f1e05a",
+    "TypeScript": "#3178c6",
+    "Java": "#b07219",
+    "Go": "#00ADD8",
+    "Rust": "#dea584",
+    "C": "#555555",
+    "C++": "#f34b7d",
+    "C#": "#178600",
+    "Ruby": "#701516",
+    "PHP": "#4F5D95",
+    "Shell": "#89e051",
+    "HTML": "#e34c26",
+    "CSS": "#563d7c",
+    "Kotlin": "#A97BFF",
+    "Swift": "#F05138",
+    "Jupyter Notebook": "#DA5B0B",
+}
+
+FONT = "font-family=\"Segoe UI, Helvetica, Arial, sans-serif\""
+
+
+def _color(lang):
+    if lang in LANGUAGE_COLORS:
+        return LANGUAGE_COLORS[lang]
+    # Stable colour for anything we don't know about
+    return "#" + hashlib.md5(lang.encode("utf-8")).hexdigest()[:6]
+
+
+def _top_languages(languages):
+    return sorted(languages.items(), key=lambda x: x[1], reverse=True)[:MAX_LANGUAGES]
+
+
+# 🎨 Renderers (pure: data in, SVG string out)
+
+def render_language_bars(languages):
+    rows = _top_languages(languages)
+    peak = max((count for _, count in rows), default=1) or 1
+    width, row_h, label_w, bar_w = 420, 26, 130, 220
+    height = 40 + row_h * len(rows)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f'<rect width="{width}" height="{height}" rx="8" fill="#ffffff" stroke="#e4e2e2"/>',
+        f'<text x="16" y="26" {FONT} font-size="15" font-weight="600" fill="#2f80ed">Top Languages</text>',
+    ]
+    for i, (lang, count) in enumerate(rows):
+        y = 40 + i * row_h
+        bar = max(2, round(bar_w * count / peak))
+        parts.append(f'<text x="16" y="{y + 15}" {FONT} font-size="12" fill="#333">{escape(lang)}</text>')
+        parts.append(f'<rect x="{label_w}" y="{y + 4}" width="{bar}" height="14" rx="3" fill="{_color(lang)}"/>')
+        parts.append(f'<text x="{label_w + bar + 6}" y="{y + 15}" {FONT} font-size="12" fill="#666">{count}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def render_language_donut(languages):
+    rows = _top_languages(languages)
+    total = sum(count for _, count in rows) or 1
+    width, height, r, cx, cy = 360, 200, 60, 100, 100
+    circumference = 2 * math.pi * r
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f'<rect width="{width}" height="{height}" rx="8" fill="#ffffff" stroke="#e4e2e2"/>',
+        f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="none" stroke="#eee" stroke-width="28"/>',
+    ]
+    offset = 0.0
+    for lang, count in rows:
+        length = circumference * count / total
+        parts.append(
+            f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="none" stroke="{_color(lang)}" stroke-width="28" '
+            f'stroke-dasharray="{length:.2f} {circumference - length:.2f}" stroke-dashoffset="{-offset:.2f}" '
+            f'transform="rotate(-90 {cx} {cy})"/>'
+        )
+        offset += length
+    for i, (lang, count) in enumerate(rows):
+        y = 30 + i * 20
+        parts.append(f'<rect x="200" y="{y - 10}" width="12" height="12" rx="2" fill="{_color(lang)}"/>')
+        parts.append(
+            f'<text x="218" y="{y}" {FONT} font-size="12" fill="#333">'
+            f'{escape(lang)} {100 * count / total:.1f}%</text>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def render_stat_card(stats):
+    rows = list(stats.items())
+    width, row_h = 360, 24
+    height = 44 + row_h * len(rows)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f'<rect width="{width}" height="{height}" rx="8" fill="#ffffff" stroke="#e4e2e2"/>',
+        f'<text x="16" y="28" {FONT} font-size="15" font-weight="600" fill="#2f80ed">GitHub Stats</text>',
+    ]
+    for i, (label, value) in enumerate(rows):
+        y = 56 + i * row_h
+        parts.append(f'<text x="16" y="{y}" {FONT} font-size="13" fill="#333">{escape(str(label))}</text>')
+        parts.append(
+            f'<text x="{width - 16}" y="{y}" {FONT} font-size="13" font-weight="600" fill="#333" '
+            f'text-anchor="end">{escape(str(value))}</text>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def build_stats(user, repos, languages, activity=None):
+    stats = {
+        "Total stars": sum(r.get("stargazers_count", 0) for r in repos or []),
+        "Total forks": sum(r.get("forks_count", 0) for r in repos or []),
+        "Public repos": user.get("public_repos", 0),
+        "Followers": user.get("followers", 0),
+    }
+    if languages:
+        stats["Top language"] = max(languages.items(), key=lambda x: x[1])[0]
+    if activity:
+        stats["Commits (recent)"] = activity.get("total_commits", 0)
+        stats["Longest streak"] = f"{activity.get('longest_streak', 0)} days"
+    return stats
+
+
+# 🖼️ Render stage
+
+def _data_hash(kind, data):
+    payload = json.dumps([CHART_VERSION, kind, data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_charts(output_dir, user, repos, languages, activity=None, base_dir="."):
+    """
+    Write the SVG charts into ``base_dir/output_dir`` and return {name: relative path}
+    for the templates. A chart is only re-rendered when the hash of its input data changes.
+    """
+    target_dir = os.path.join(base_dir, output_dir)
+    os.makedirs(target_dir, exist_ok=True)
+
+    jobs = {
+        "languages": (render_language_bars, languages or {}),
+        "languages_donut": (render_language_donut, languages or {}),
+        "stats": (render_stat_card, build_stats(user, repos, languages, activity)),
+    }
+
+    charts = {}
+    for name, (renderer, data) in jobs.items():
+        if name.startswith("languages") and not data:
+            continue
+
+        filename = f"{name}.svg"
+        path = os.path.join(target_dir, filename)
+        key = os.path.abspath(path)
+        digest = _data_hash(name, data)
+        fresh = store.get_chart_hash(key) == digest and os.path.exists(path)
+        metrics.record_cache("charts", fresh)
+        if not fresh:
+            atomic_write(path, [renderer(data)])
+            store.put_chart_hash(key, digest)
+
+        charts[name] = f"{output_dir.rstrip('/')}/{filename}".replace(os.sep, "/")
+    return charts
@@ -1,24 +1,29 @@
 import sys
 from rich.panel import Panel
 import os
-import requests
 from dotenv import load_dotenv, set_key
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.prompt import Prompt, Confirm
 
-from . import config, core, fetch, markdown as port_markdown
+from . import config, core, fetch, headless, metrics, replay, store, markdown as port_markdown
 from .language import get_language_stats
 from .plugins import discover_plugins
 
 console = Console()
+# Status lines that must never end up in piped output (e.g. generate --stdout)
+status_console = Console(stderr=True)
 
 def print_usage():
     console.print(
-        "[green]Usage:[/green] pushfolio [init|generate|preview|languages|plugins|gallery|reset-token|config|plugin|theme|openai|help]"
+        "[green]Usage:[/green] pushfolio [init|generate|preview|languages|plugins|gallery|reset-token|config|plugin|theme|openai|cache|help]"
     )
     console.print(
-        "[yellow]Smart commands:[/yellow] config show/reset, plugin enable/disable <name>, theme switch, openai reset"
+        "[yellow]Smart commands:[/yellow] config show/reset, plugin enable/disable <name>, theme switch, openai reset, cache stats/vacuum/clear"
+    )
+    console.print(
+        "[cyan]Any command:[/cyan] --headless, --report <run.json>, --metrics-textfile <file.prom>, "
+        "--record <dir> | --replay <dir> [--replay-latency <seconds|recorded>]"
     )
 
 def validate_github_token(token):
@@ -26,9 +31,12 @@ def validate_github_token(token):
     if not token:
         console.print("[red]❌ No token found for validation.[/red]")
         return False
+    if replay.replaying():
+        # Nothing to validate offline (and nothing to re-prompt or save to .env)
+        return True
     headers = {"Authorization": f"token {token}", "User-Agent": "Pushfolio CLI"}
     try:
-        response = requests.get("https://api.github.com/user", headers=headers)
+        response = replay.http_get("https://api.github.com/user", headers=headers)
         console.print(f"[cyan][debug] Token status: {response.status_code}[/cyan]")
         if response.status_code == 200:
             console.print(f"[green][debug] Token is valid for: {response.json().get('login')}[/green]")
@@ -42,6 +50,8 @@ def validate_github_token(token):
 
 def get_and_save_token():
     """Prompt user for token, clean it, save to .env, and reload environment."""
+    if headless.enabled():
+        headless.fail("invalid_token", "GITHUB_TOKEN is missing or invalid", hint="Export a valid GITHUB_TOKEN")
     token = Prompt.ask("🔐 Enter your GitHub token")
     token = token.strip().replace('"', '').replace("'", '')
     save = Prompt.ask("💾 Save this token to .env for future use?", choices=["yes", "no"], default="yes")
@@ -51,8 +61,86 @@ def get_and_save_token():
     os.environ["GITHUB_TOKEN"] = token
     return token
 
+def _pop_option(argv, name):
+    """Remove ``name <value>`` (or ``name=<value>``) from argv and return the value."""
+    for i, arg in enumerate(argv):
+        if arg == name and i + 1 < len(argv):
+            value = argv[i + 1]
+            del argv[i:i + 2]
+            return value
+        if arg.startswith(name + "="):
+            del argv[i]
+            return arg.split("=", 1)[1]
+    return None
+
+def pop_transport_options(argv):
+    """🎞️ Global --record/--replay <dir> and --replay-latency <seconds|recorded> for every command."""
+    return _pop_option(argv, "--record"), _pop_option(argv, "--replay"), _pop_option(argv, "--replay-latency")
+
+def apply_transport_options(record_dir, replay_dir, latency):
+    if record_dir and replay_dir:
+        status_console.print("[red]❌ Use either --record or --replay, not both.[/red]")
+        sys.exit(1)
+
+    if replay_dir:
+        replay.configure("replay", replay_dir, latency)
+        # Cassettes aren't keyed on the token, so any non-empty value will do
+        os.environ.setdefault("GITHUB_TOKEN", replay.REPLAY_TOKEN)
+        status_console.print(f"[cyan]🎞️ Replaying recorded responses from {replay_dir}[/cyan]")
+    elif record_dir:
+        replay.configure("record", record_dir)
+        status_console.print(f"[cyan]🎞️ Recording responses into {record_dir}[/cyan]")
+
+# ⌨️ Commands (or subcommands) that only make sense with a human at the keyboard
+INTERACTIVE_COMMANDS = {
+    ("init", None), ("reset-token", None), ("theme", "switch"), ("openai", "reset"),
+    ("config", "reset"), ("cache", "clear"),
+}
+
 def run():
-    load_dotenv(override=True)
+    # 📈 --report <file.json> / --metrics-textfile <file.prom> work with every command
+    report_path = _pop_option(sys.argv, "--report")
+    prom_path = _pop_option(sys.argv, "--metrics-textfile")
+    # Strip every global option first so argv[1] is the command for the report too
+    use_headless = "--headless" in sys.argv
+    while "--headless" in sys.argv:
+        sys.argv.remove("--headless")
+    transport = pop_transport_options(sys.argv)
+    metrics.start(sys.argv[1].lower() if len(sys.argv) > 1 else None)
+
+    try:
+        _run_command(use_headless, transport)
+        metrics.finish()
+    except headless.HeadlessError as e:
+        metrics.finish(success=False, error=e.code)
+        headless.report(e)
+        sys.exit(headless.EXIT_CODE)
+    except SystemExit as e:
+        metrics.finish(success=e.code in (0, None))
+        raise
+    except BaseException as e:
+        metrics.finish(success=False, error=repr(e))
+        raise
+    finally:
+        _write_run_report(report_path, prom_path)
+
+def _write_run_report(report_path, prom_path):
+    try:
+        if report_path:
+            metrics.write_json(report_path)
+        if prom_path:
+            metrics.write_prometheus(prom_path)
+    except OSError as e:
+        console.print(f"[red]⚠️ Couldn't write run report: {e}[/red]")
+
+def _run_command(use_headless=False, transport=(None, None, None)):
+    if use_headless:
+        headless.enable()
+
+    # Headless runs take settings from the real environment only (no .env file I/O)
+    if not headless.enabled():
+        load_dotenv(override=True)
+    apply_transport_options(*transport)
 
     if len(sys.argv) < 2:
         console.print("[red]❌ No command provided.[/red]")
@@ -61,11 +149,25 @@ def run():
 
     cmd = sys.argv[1].lower()
 
+    if headless.enabled():
+        subcmd = sys.argv[2] if len(sys.argv) > 2 else None
+        if (cmd, None) in INTERACTIVE_COMMANDS or (cmd, subcmd) in INTERACTIVE_COMMANDS:
+            headless.fail("interactive_command", f"'{' '.join(sys.argv[1:3])}' needs a terminal and can't run headless")
+
     if cmd == "init":
         config.init_config()
 
     elif cmd in ("generate", "gen"):
-        core.generate_readme()
+        from argparse import ArgumentParser
+
+        parser = ArgumentParser(prog="pushfolio generate")
+        parser.add_argument("--output", type=str, default=core.README_FILE, help="Where to write the README")
+        parser.add_argument("--stdout", action="store_true", help="Print the README to stdout instead of writing a file")
+        args = parser.parse_args(sys.argv[2:])
+
+        report = core.generate_readme(output_path=args.output, to_stdout=args.stdout, command=cmd)
+        if report.get("success") is False:
+            sys.exit(1)
 
     elif cmd == "preview":
         from argparse import ArgumentParser
@@ -83,9 +185,10 @@ def run():
 
         username = settings.get("github_username")
         if not username:
-            username = Prompt.ask("👤 Enter your GitHub username")
-            settings["github_username"] = username
-            config.save_config(settings)
+            username = core.resolve_username(settings)
+            if not headless.enabled():
+                settings["github_username"] = username
+                config.save_config(settings)
 
         token = os.getenv("GITHUB_TOKEN", "").strip()
         console.print(f"[cyan][debug] Token loaded: {token[:6]}...{token[-4:] if token else ''}[/cyan]")
@@ -104,7 +207,9 @@ def run():
             repos_data = fetch.get_repos_data(username, token)
             language_stats = fetch.get_language_stats(repos_data)
             top_repo = fetch.get_top_starred_repo(repos_data)
-            latest_commit = fetch.get_latest_commit(username, repos_data, token)
+            latest_commit = None
+            if "latest_commit" in core.plan_fetches(settings):
+                latest_commit = fetch.get_latest_commit(username, repos_data, token)
 
             if settings.get("use_ai", False) and not settings.get("bio"):
                 from .ai import generate_bio
@@ -156,9 +261,10 @@ def run():
 
         username = settings.get("github_username")
         if not username:
-            username = Prompt.ask("👤 Enter your GitHub username")
-            settings["github_username"] = username
-            config.save_config(settings)
+            username = core.resolve_username(settings)
+            if not headless.enabled():
+                settings["github_username"] = username
+                config.save_config(settings)
 
         token = os.getenv("GITHUB_TOKEN", "").strip()
         if not token or not validate_github_token(token):
@@ -189,16 +295,22 @@ def run():
             console.print(f"  • [green]{name}[/green]")
 
     elif cmd == "gallery":
+        from argparse import ArgumentParser
+        from concurrent.futures import ThreadPoolExecutor, as_completed
         from os import listdir
-        from . import markdown
+
+        parser = ArgumentParser(prog="pushfolio gallery")
+        parser.add_argument("--save-dir", type=str, help="Write every preview into this folder instead of the terminal")
+        args = parser.parse_args(sys.argv[2:])
 
         settings = config.load_config()
 
         username = settings.get("github_username")
         if not username:
-            username = Prompt.ask("👤 Enter your GitHub username")
-            settings["github_username"] = username
-            config.save_config(settings)
+            username = core.resolve_username(settings)
+            if not headless.enabled():
+                settings["github_username"] = username
+                config.save_config(settings)
 
         token = os.getenv("GITHUB_TOKEN", "").strip()
         if not token or not validate_github_token(token):
@@ -212,24 +324,45 @@ def run():
         repos_data = fetch.get_repos_data(username, token)
         language_stats = fetch.get_language_stats(repos_data)
         top_repo = fetch.get_top_starred_repo(repos_data)
-        latest_commit = fetch.get_latest_commit(username, repos_data, token)
-
-        templates = [f for f in listdir("templates") if f.endswith(".md")]
-        for template in templates:
-            console.rule(f"🧩 {template}")
-            dummy_settings = {
-                **settings,
-                "template": template
+
+        # 🗺️ Fetch what any of the templates uses, once
+        templates = sorted(f for f in listdir(port_markdown.TEMPLATES_DIR) if f.endswith(".md"))
+        needed = set().union(*(port_markdown.data_plan(t, settings) for t in templates))
+        latest_commit = None
+        if "latest_commit" in needed:
+            latest_commit = fetch.get_latest_commit(username, repos_data, token)
+
+        # 🧩 Context (and plugin blocks) are built once and shared by every template
+        context = port_markdown.build_context(
+            user_data,
+            repos_data,
+            language_stats,
+            top_repo,
+            latest_commit,
+            settings,
+            run_plugins="template_plugins" in needed
+        )
+
+        if args.save_dir:
+            os.makedirs(args.save_dir, exist_ok=True)
+
+        with ThreadPoolExecutor() as pool:
+            futures = {
+                pool.submit(port_markdown.render_template, template, context): template
+                for template in templates
             }
-            preview = port_markdown.build_readme(
-                user_data,
-                repos_data,
-                language_stats,
-                top_repo,
-                latest_commit,
-                dummy_settings
-            )
-            console.print(Markdown(preview))
+            # 📺 Stream each preview as soon as it's ready
+            for future in as_completed(futures):
+                template = futures[future]
+                preview = future.result()
+                if args.save_dir:
+                    path = os.path.join(args.save_dir, template)
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(preview)
+                    console.print(f"[green]✅ Saved {template} → [bold]{path}[/bold][/green]")
+                else:
+                    console.rule(f"🧩 {template}")
+                    console.print(Markdown(preview))
 
     elif cmd == "reset-token":
         if Confirm.ask("🔐 Do you want to reset your GitHub token?", default=True):
@@ -259,17 +392,14 @@ def run():
     elif cmd == "plugin":
         subcmd = sys.argv[2] if len(sys.argv) > 2 else None
         plugin_name = sys.argv[3] if len(sys.argv) > 3 else None
-        plugins_cfg = config.load_config().get("plugins", {})
+        settings = config.load_config()
+        plugins_cfg = settings.setdefault("plugins", {})
         if subcmd == "enable" and plugin_name:
             plugins_cfg[plugin_name] = True
-            settings = config.load_config()
-            settings["plugins"] = plugins_cfg
             config.save_config(settings)
             console.print(f"[green]Enabled plugin: {plugin_name}[/green]")
         elif subcmd == "disable" and plugin_name:
             plugins_cfg[plugin_name] = False
-            settings = config.load_config()
-            settings["plugins"] = plugins_cfg
             config.save_config(settings)
             console.print(f"[red]Disabled plugin: {plugin_name}[/red]")
         else:
@@ -303,6 +433,25 @@ def run():
         else:
             console.print("[yellow]Usage: pushfolio openai reset[/yellow]")
 
+    elif cmd == "cache":
+        subcmd = sys.argv[2] if len(sys.argv) > 2 else None
+        if subcmd == "stats":
+            info = store.stats()
+            console.print(f"[bold cyan]Pushfolio cache:[/bold cyan] {info['path']} ({info['file_size']:,} bytes)")
+            for table, count in info["tables"].items():
+                console.print(f"[yellow]{table}[/yellow]: {count} rows")
+        elif subcmd == "vacuum":
+            removed = store.evict()
+            store.vacuum()
+            console.print(f"[green]✅ Cache compacted ({removed} old entries evicted).[/green]")
+        elif subcmd == "clear":
+            if Confirm.ask("[red]Clear all cached Pushfolio data?[/red]", default=False):
+                store.clear()
+                store.vacuum()
+                console.print("[green]✅ Cache cleared.[/green]")
+        else:
+            console.print("[yellow]Usage: pushfolio cache stats|vacuum|clear[/yellow]")
+
     else:
         console.print(f"[red]❌ Unknown command: {cmd}[/red]")
         print_usage()
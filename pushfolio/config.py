@@ -1,5 +1,6 @@
 # pushfolio/config.py
 
+import copy
 import json
 import os
 from rich.prompt import Prompt
@@ -7,6 +8,7 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.markdown import Markdown
 from dotenv import set_key, load_dotenv
+from .output import atomic_write
 
 console = Console()
 CONFIG_FILE = ".pushfolio_config.json"
@@ -17,10 +19,24 @@ DEFAULT_CONFIG = {
     "show_top_repo": True,
     "show_latest_commit": True,
     "show_languages": True,
+    "show_repo_tables": True,
+    "repo_table_size": 10,
+    "ranking_orgs": [],
+    "show_activity": True,
+    "activity_weeks": 12,
+    "show_charts": True,
+    "charts_dir": "assets/charts",
+    "ai_failure_policy": "fallback",
+    "plugin_sandbox": True,
+    "plugin_workers": 2,
+    "plugin_memory_mb": 512,
+    "plugin_cpu_seconds": 5,
+    "plugin_max_tasks": 50,
     "use_ai": False,
     "include_socials": True,
     "theme": "emoji-fun",
     "template": "default.md",
+    "outputs": [],
     "socials": {
         "linkedin": "",
         "twitter": "",
@@ -29,6 +45,40 @@ DEFAULT_CONFIG = {
     }
 }
 
+# 📐 Expected type for each known key (unknown keys are passed through untouched)
+CONFIG_SCHEMA = {
+    "show_about": bool,
+    "show_top_repo": bool,
+    "show_latest_commit": bool,
+    "show_languages": bool,
+    "show_repo_tables": bool,
+    "repo_table_size": int,
+    "ranking_orgs": list,
+    "show_activity": bool,
+    "activity_weeks": int,
+    "show_charts": bool,
+    "charts_dir": str,
+    "ai_failure_policy": str,
+    "plugin_sandbox": bool,
+    "plugin_workers": int,
+    "plugin_memory_mb": int,
+    "plugin_cpu_seconds": int,
+    "plugin_max_tasks": int,
+    "use_ai": bool,
+    "include_socials": bool,
+    "theme": str,
+    "template": str,
+    "outputs": list,
+    "socials": dict,
+    "plugins": dict,
+    "github_username": str,
+    "name": str,
+    "bio": str,
+}
+
+# 🗃️ Per-process cache, invalidated when the file's mtime/size changes
+_cache = {"stamp": None, "data": None}
+
 def preview_markdown_file(path):
     try:
         with open(path, "r", encoding="utf-8") as f:
@@ -135,7 +185,7 @@ def init_config():
             ai_bio = ""
 
     # Save Config
-    config = DEFAULT_CONFIG.copy()
+    config = copy.deepcopy(DEFAULT_CONFIG)
     config["theme"] = template
     config["template"] = template
     config["name"] = name
@@ -150,8 +200,7 @@ def init_config():
     config["use_ai"] = use_ai == "yes"
 
     try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=4)
+        save_config(config)
         console.print(Panel.fit(
             f"🥳 [green]Setup complete![/green] 🥳\n[cyan]Your chosen theme:[/cyan] {template}\n"
             f"[bold]✨ Your story is ready to shine! ✨[/bold]",
@@ -162,18 +211,60 @@ def init_config():
         console.print(f"[red]❌ Could not save config: {e}[/red]")
         console.print("Try running the program as administrator, or check file permissions.")
 
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                console.print("[red]❌ Config file is corrupted. Using default values.[/red]")
-                return DEFAULT_CONFIG
-    else:
+def _file_stamp():
+    try:
+        st = os.stat(CONFIG_FILE)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def deep_merge(base, override):
+    """Return a new dict with ``override`` merged onto ``base`` (neither is mutated)."""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+def validate_config(data):
+    """Drop values whose type doesn't match CONFIG_SCHEMA so defaults show through."""
+    if not isinstance(data, dict):
+        console.print("[red]❌ Config file must contain a JSON object. Using default values.[/red]")
+        return {}
+
+    valid = {}
+    for key, value in data.items():
+        expected = CONFIG_SCHEMA.get(key)
+        if expected and not isinstance(value, expected):
+            console.print(f"[yellow]⚠️ Ignoring config '{key}': expected {expected.__name__}, got {type(value).__name__}[/yellow]")
+            continue
+        valid[key] = value
+    return valid
+
+def _read_config():
+    if not os.path.exists(CONFIG_FILE):
         console.print("[yellow]⚠️ Config file not found. Run 'python -m pushfolio init' to create it.[/yellow]")
-        return DEFAULT_CONFIG
+        return {}
+    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+        try:
+            return validate_config(json.load(f))
+        except json.JSONDecodeError:
+            console.print("[red]❌ Config file is corrupted. Using default values.[/red]")
+            return {}
+
+def load_config():
+    stamp = _file_stamp()
+    if _cache["data"] is None or stamp != _cache["stamp"]:
+        _cache["data"] = deep_merge(DEFAULT_CONFIG, _read_config())
+        _cache["stamp"] = stamp
+    # Callers are free to mutate what they get back
+    return copy.deepcopy(_cache["data"])
 
 def save_config(data):
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    # ✍️ Write to a temp file next to the config, then swap it in atomically
+    atomic_write(CONFIG_FILE, [json.dumps(data, indent=4)])
+
+    _cache["data"] = deep_merge(DEFAULT_CONFIG, validate_config(data))
+    _cache["stamp"] = _file_stamp()
@@ -1,25 +1,59 @@
+import asyncio
+import contextlib
+import math
 import os
+import sys
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.prompt import Prompt
-from . import fetch, markdown, config
+from . import activity, charts, fetch, headless, markdown, metrics, config, plugin_host, replay, store, ranking, targets
+from .output import stream_write
 from .ai import generate_bio
 import importlib.util
-import requests
+import itertools
 
 console = Console()
+README_FILE = "README.md"
 
-def ensure_token(env_var, prompt_text, test_url=None):
-    token = os.getenv(env_var)
-
-    # Check if missing or placeholder
-    invalid_token = (
+def _is_placeholder(token):
+    return (
         not token or
         "your" in token.lower() or
         "placeholder" in token.lower() or
         token.strip() == ""
     )
 
+def _ensure_token_headless(env_var, test_url=None):
+    # 🤖 No prompts and no .env reads/writes: the token must already be in the environment
+    token = (os.getenv(env_var) or "").strip()
+    if _is_placeholder(token):
+        headless.fail("missing_token", f"{env_var} is not set", hint=f"Export {env_var} before running in headless mode")
+
+    if test_url:
+        headers = {"Authorization": f"Bearer {token}"}
+        try:
+            response = replay.http_get(test_url, headers=headers)
+        except Exception as e:
+            headless.fail("token_check_failed", f"Could not validate {env_var}: {e}")
+        if response.status_code == 401:
+            headless.fail("invalid_token", f"{env_var} is invalid or unauthorized")
+
+    return token
+
+def ensure_token(env_var, prompt_text, test_url=None):
+    if replay.replaying():
+        # 🎞️ Replays never validate, prompt for or save a token, headless or not: a real
+        # one isn't needed and the stand-in must not end up in .env
+        token = (os.getenv(env_var) or "").strip()
+        return token if not _is_placeholder(token) else replay.REPLAY_TOKEN
+    if headless.enabled():
+        return _ensure_token_headless(env_var, test_url)
+
+    token = os.getenv(env_var)
+
+    # Check if missing or placeholder
+    invalid_token = _is_placeholder(token)
+
     if invalid_token:
         console.print(f"[yellow]⚠️ {env_var} not found or invalid in .env[/yellow]")
         token = Prompt.ask(prompt_text)
@@ -28,7 +62,7 @@ def ensure_token(env_var, prompt_text, test_url=None):
     if token and test_url:
         headers = {"Authorization": f"Bearer {token}"}
         try:
-            response = requests.get(test_url, headers=headers)
+            response = replay.http_get(test_url, headers=headers)
             if response.status_code == 401:
                 raise Exception("Unauthorized")
         except:
@@ -85,9 +119,73 @@ def _write_token(env_var, value):
         if not updated:
             f.write(f"{env_var}={value}\n")
 
-def load_plugins(context):
-    plugin_dir = "plugins"
+PLUGIN_DIR = "plugins"
+
+def _plugin_paths():
+    if not os.path.exists(PLUGIN_DIR):
+        return []
+    return [
+        (filename, os.path.join(PLUGIN_DIR, filename))
+        for filename in os.listdir(PLUGIN_DIR)
+        if filename.endswith(".py")
+    ]
+
+# What each plugin context key costs to fetch (see generate_readme_async)
+PLUGIN_FIELD_DATA = {
+    "repos": {"repos"},
+    "languages": {"repos"},
+    "top_repo": {"repos"},
+    "latest_commit": {"repos", "latest_commit"},
+}
+
+def plan_fetches(settings, templates=None):
+    """
+    The data this run needs: what the templates use (markdown.data_plan), plus
+    whatever the run() plugins declare in CONTEXT_FIELDS and the AI bio.
+    ``templates`` defaults to the configured README template.
+    """
+    needed = set()
+    for template_file in templates or [settings.get("template", "default.md")]:
+        needed |= markdown.data_plan(template_file, settings)
+
+    for filename, path in _plugin_paths():
+        try:
+            fields = plugin_host.inspect_plugin(path)["fields"]
+        except Exception:
+            fields = None
+        # Undeclared plugins could read anything
+        for field in PLUGIN_FIELD_DATA if fields is None else fields:
+            needed |= PLUGIN_FIELD_DATA.get(field, set())
+
+    if settings.get("use_ai", False):
+        needed.add("repos")
+    if not settings.get("show_latest_commit", True):
+        needed.discard("latest_commit")
+    return needed
+
+def run_plugins_sandboxed(context):
+    # 🧪 Same contract as load_plugins(), but each run() executes in the rlimited worker pool
+    jobs = []
+    for filename, path in _plugin_paths():
+        try:
+            if "run" in plugin_host.inspect_plugin(path)["entries"]:
+                jobs.append((filename, path, "run", context))
+        except Exception as e:
+            metrics.record_plugin(filename, e)
+            console.print(f"[red]⚠️ Failed to run plugin {filename}: {e}[/red]")
+
     plugin_outputs = []
+    for result in plugin_host.get_host(context.get("settings") or {}).run_many(jobs):
+        metrics.record_plugin(result["name"], result["error"], result["usage"])
+        if result["error"]:
+            console.print(f"[red]⚠️ Failed to run plugin {result['name']}: {result['error']}[/red]")
+        elif result["output"]:
+            plugin_outputs.append(result["output"].strip())
+    return plugin_outputs
+
+def _load_plugin_modules():
+    plugin_dir = PLUGIN_DIR
+    modules = []
 
     if not os.path.exists(plugin_dir):
         return []
@@ -102,19 +200,116 @@ def load_plugins(context):
         try:
             spec.loader.exec_module(plugin)
             if hasattr(plugin, "run"):
-                output = plugin.run(context)
-                if output:
-                    plugin_outputs.append(output.strip())
+                modules.append((filename, plugin))
         except Exception as e:
             console.print(f"[red]⚠️ Failed to run plugin {filename}: {e}[/red]")
 
+    return modules
+
+def _run_plugin(filename, plugin, context):
+    try:
+        output = plugin.run(context)
+        metrics.record_plugin(filename)
+        return output.strip() if output else None
+    except Exception as e:
+        metrics.record_plugin(filename, e)
+        console.print(f"[red]⚠️ Failed to run plugin {filename}: {e}[/red]")
+        return None
+
+def load_plugins(context):
+    plugin_outputs = []
+    for filename, plugin in _load_plugin_modules():
+        output = _run_plugin(filename, plugin, context)
+        if output:
+            plugin_outputs.append(output)
     return plugin_outputs
 
-def generate_readme():
-    load_dotenv()
-    settings = config.load_config()
+async def load_plugins_async(context):
+    if (context.get("settings") or {}).get("plugin_sandbox", True):
+        return await asyncio.to_thread(run_plugins_sandboxed, context)
+
+    # 🧩 Plugins don't depend on each other, so run them side by side (order is kept)
+    modules = await asyncio.to_thread(_load_plugin_modules)
+    outputs = await asyncio.gather(*(
+        asyncio.to_thread(_run_plugin, filename, plugin, context) for filename, plugin in modules
+    ))
+    return [output for output in outputs if output]
+
+async def _timed(stage, awaitable):
+    with metrics.stage(stage):
+        return await awaitable
+
+async def fetch_repos_async(username, token, user_task):
+    """All repo pages: page 1 races the user fetch, the rest are fetched together."""
+    first_page = await asyncio.to_thread(fetch.get_repos_page, username, token, 1)
+    if len(first_page) < fetch.REPOS_PER_PAGE:
+        return first_page
+
+    user_data = await user_task
+    pages = max(math.ceil(user_data.get("public_repos", 0) / fetch.REPOS_PER_PAGE), 2)
+    rest = await asyncio.gather(*(
+        asyncio.to_thread(fetch.get_repos_page, username, token, page) for page in range(2, pages + 1)
+    ))
+
+    repos = list(first_page)
+    for page_repos in rest:
+        repos.extend(page_repos)
+
+    # The public_repos count can lag behind; keep paging if the last page was full
+    if len(rest[-1]) == fetch.REPOS_PER_PAGE:
+        repos.extend(await asyncio.to_thread(
+            lambda: list(fetch.iter_repos(username, token, start_page=pages + 1))
+        ))
+    return repos
+
+def _rank_with_orgs(repos, orgs, token, k):
+    # 🏢 Org repos are streamed page by page into the rankers, never held as one big list
+    streams = [repos] + [fetch.iter_org_repos(org, token) for org in orgs]
+    try:
+        return ranking.rank_repos(itertools.chain(*streams), k)
+    except Exception as e:
+        console.print(f"[red]⚠️ Failed to rank org repos: {e}[/red]")
+        return ranking.rank_repos(repos, k)
+
+def _get_activity(username, token, weeks):
+    # 📅 Optional like the charts: a failure drops the section instead of the run
+    try:
+        return activity.get_activity(username, token, weeks)
+    except Exception as e:
+        console.print(f"[red]⚠️ Failed to compute activity: {e}[/red]")
+        return None
+
+def _render_charts(settings, needed, output_path, user_data, repos_data, language_stats, activity_stats):
+    # 📊 SVGs live next to the README so the relative links in it resolve on GitHub
+    if not settings.get("show_charts", True) or "charts" not in needed:
+        return {}
+    try:
+        return charts.render_charts(
+            settings.get("charts_dir", "assets/charts"),
+            user_data,
+            repos_data,
+            language_stats,
+            activity_stats,
+            base_dir=os.path.dirname(os.path.abspath(output_path))
+        )
+    except Exception as e:
+        console.print(f"[red]⚠️ Failed to render charts: {e}[/red]")
+        return {}
+
+def resolve_username(settings):
+    username = settings.get("github_username") or os.getenv(headless.USERNAME_ENV_VAR, "").strip()
+    if username:
+        return username
+    if headless.enabled():
+        headless.fail(
+            "missing_username",
+            "No GitHub username configured",
+            hint=f"Set github_username in {config.CONFIG_FILE} or export {headless.USERNAME_ENV_VAR}"
+        )
+    return Prompt.ask("👤 Enter your GitHub username")
 
-    username = settings.get("github_username") or Prompt.ask("👤 Enter your GitHub username")
+def _resolve_username_and_token(settings):
+    username = resolve_username(settings)
 
     # ✅ GitHub token
     github_token = ensure_token(
@@ -122,19 +317,124 @@ def generate_readme():
         "🔐 Enter your GitHub token",
         test_url="https://api.github.com/user"
     )
+    return username, github_token
+
+def _write_target(target, context, plugin_sections, output_path, stdout=None):
+    try:
+        if stdout is not None:
+            stream_write(stdout, targets.target_chunks(target, context, plugin_sections))
+            return None
+        status = targets.write_target(target, context, plugin_sections, output_path)
+    except markdown.TemplateRenderError as e:
+        # The old file (if any) is left untouched; the run is marked failed instead
+        console.print(f"[red]❌ {target['path']} not written: {e}[/red]")
+        metrics.set_value("success", False)
+        metrics.set_value("error", str(e))
+        return "failed"
+
+    if status == "written":
+        console.print(f"[bold green]✅ {target['path']} generated successfully![/bold green]")
+    else:
+        console.print(f"[dim]ℹ️ {target['path']} is already up to date.[/dim]")
+    return status
+
+async def _write_targets(output_targets, context, plugin_sections, output_path, stdout=None):
+    # 📤 One context, every target rendered and written concurrently
+    statuses = await asyncio.gather(*(
+        asyncio.to_thread(_write_target, target, context, plugin_sections, output_path, stdout)
+        for target in output_targets
+    ))
+    if stdout is None:
+        metrics.set_value("outputs", {t["path"]: status for t, status in zip(output_targets, statuses)})
+        metrics.set_value("readme_changed", statuses[0] == "written")
+
+async def generate_readme_async(output_path=README_FILE, stdout=None):
+    """
+    Concurrent version of the generate pipeline.
+
+    user ─┐
+    repos ┴─► languages/top repo ─┬─► latest commit probing ─┐
+                                  └─► AI bio ────────────────┴─► plugins + context ─┬─► README.md
+                                                                                     └─► `outputs` (HTML, JSON, ...)
+    """
+    if not headless.enabled():
+        load_dotenv()
+    settings = config.load_config()
+    if headless.enabled() and settings.get("use_ai", False):
+        # Catch a mistyped policy up front, not only once the AI call happens to fail
+        headless.ai_failure_policy(settings)
+    with metrics.stage("credentials"):
+        username, github_token = _resolve_username_and_token(settings)
+
+    # 🎯 The README plus any extra `outputs` targets (stdout only ever gets the README)
+    output_targets = targets.resolve_targets(settings, output_path)
+    if stdout is not None:
+        output_targets = output_targets[:1]
+
+    # 🗺️ Only fetch what the templates, plugins and AI will actually use
+    needed = plan_fetches(settings, targets.templates_for(output_targets))
+    metrics.set_value("data_plan", sorted(needed))
 
     console.print("\n📄 [bold]Generating your GitHub README...[/bold]")
 
+    user_task = asyncio.ensure_future(_timed(
+        "fetch_user", asyncio.to_thread(fetch.get_user_data, username, github_token)
+    ))
+    activity_task = None
+    if "activity" in needed:
+        # 📅 Only needs the username, so it runs alongside everything else
+        activity_task = asyncio.ensure_future(_timed("activity", asyncio.to_thread(
+            _get_activity, username, github_token, settings.get("activity_weeks", 12)
+        )))
+    commit_task = None
+    rankings_task = None
     try:
-        user_data = fetch.get_user_data(username, github_token)
-        repos_data = fetch.get_repos_data(username, github_token)
+        repos_data = []
+        if "repos" in needed:
+            repos_data = await _timed("fetch_repos", fetch_repos_async(username, github_token, user_task))
         language_stats = fetch.get_language_stats(repos_data)
         top_repo = fetch.get_top_starred_repo(repos_data)
-        latest_commit = fetch.get_latest_commit(username, repos_data, github_token)
+        if "latest_commit" in needed:
+            commit_task = asyncio.ensure_future(_timed(
+                "latest_commit", fetch.get_latest_commit_async(username, repos_data, github_token)
+            ))
+        if "rankings" in needed and settings.get("ranking_orgs"):
+            rankings_task = asyncio.ensure_future(_timed("rankings", asyncio.to_thread(
+                _rank_with_orgs,
+                repos_data,
+                settings["ranking_orgs"],
+                github_token,
+                settings.get("repo_table_size", 10)
+            )))
+        user_data = await user_task
     except Exception as e:
+        for task in (user_task, activity_task, commit_task, rankings_task):
+            if task:
+                task.cancel()
         console.print(f"[red]❌ Failed to fetch GitHub data: {e}[/red]")
+        metrics.set_value("success", False)
+        metrics.set_value("error", f"Failed to fetch GitHub data: {e}")
         return
 
+    store.put_profile_snapshot(username, user_data)
+
+    # 🤖 AI-powered About Me only needs the repos, so it overlaps with commit probing
+    if settings.get("use_ai", False):
+        console.print("[cyan]💡 Attempting to generate About Me using OpenAI...[/cyan]")
+        ai_context = {
+            "username": username,
+            "user": user_data,
+            "repos": repos_data,
+            "languages": language_stats,
+            "top_repo": top_repo,
+            "settings": settings
+        }
+        user_data["bio"] = await _timed("ai_bio", asyncio.to_thread(generate_bio, ai_context))
+
+    latest_commit = await commit_task if commit_task else None
+    rankings = await rankings_task if rankings_task else None
+    activity_stats = await activity_task if activity_task else None
+
     plugin_context = {
         "username": username,
         "user": user_data,
@@ -145,28 +445,47 @@ def generate_readme():
         "settings": settings
     }
 
-    # 🤖 AI-powered About Me (let generate_bio handle fallback logic)
-    if settings.get("use_ai", False):
-        console.print("[cyan]💡 Attempting to generate About Me using OpenAI...[/cyan]")
-        os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
-        bio = generate_bio(plugin_context)
-        user_data["bio"] = bio
-
-    plugin_sections = load_plugins(plugin_context)
-
-    readme_content = markdown.build_readme(
-        user_data,
-        repos_data,
-        language_stats,
-        top_repo,
-        latest_commit,
-        settings
+    plugin_sections, render_context, chart_paths = await asyncio.gather(
+        _timed("plugins", load_plugins_async(plugin_context)),
+        _timed("build_context", asyncio.to_thread(
+            markdown.build_context,
+            user_data,
+            repos_data,
+            language_stats,
+            top_repo,
+            latest_commit,
+            settings,
+            rankings if "rankings" in needed else {},
+            activity_stats,
+            "template_plugins" in needed
+        )),
+        _timed("charts", asyncio.to_thread(
+            _render_charts, settings, needed, output_path, user_data, repos_data, language_stats, activity_stats
+        ))
     )
+    render_context["charts"] = chart_paths
 
-    if plugin_sections:
-        readme_content += "\n\n" + "\n\n".join(plugin_sections)
+    # 📝 Rendered chunks stream straight into each output; nothing is built up in memory
+    await _timed("render_write", _write_targets(output_targets, render_context, plugin_sections, output_path, stdout))
 
-    with open("README.md", "w", encoding="utf-8") as f:
-        f.write(readme_content)
-
-    console.print("[bold green]✅ README.md generated successfully![/bold green]")
+def generate_readme(output_path=README_FILE, to_stdout=False, command="generate"):
+    """
+    Run the pipeline; returns the run report (see pushfolio.metrics). Every call
+    starts a fresh report, so direct callers get the same numbers as the CLI.
+    """
+    metrics.start(command)
+    try:
+        if not to_stdout:
+            asyncio.run(generate_readme_async(output_path))
+        else:
+            # Keep the pipe clean: status output goes to stderr, the README to stdout
+            out = sys.stdout
+            with contextlib.redirect_stdout(sys.stderr):
+                asyncio.run(generate_readme_async(output_path, stdout=out))
+    except headless.HeadlessError as e:
+        metrics.finish(success=False, error=e.code)
+        raise
+    except BaseException as e:
+        metrics.finish(success=False, error=repr(e))
+        raise
+    return metrics.finish()
@@ -1,5 +1,6 @@
-import requests
+import asyncio
 from collections import defaultdict
+from . import metrics, replay, store
 
 def github_request(url, token):
     # Detect token type for Authorization header
@@ -17,18 +18,55 @@ def github_request(url, token):
     print(f"🔎 [DEBUG] Requesting: {url}")
     print(f"🧠 [DEBUG] Auth header: {auth_type} {token[:4]}...{token[-4:]}")
 
-    response = requests.get(url, headers=headers)
+    # 📦 Conditional request: a 304 reuses the stored body and doesn't cost rate limit
+    cached = store.get_http_response(url)
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+
+    response = replay.http_get(url, headers=headers)
+    if response.status_code == 304 and cached:
+        metrics.record_cache("http", True)
+        return cached["body"]
+    metrics.record_cache("http", False)
     response.raise_for_status()
-    return response.json()
+
+    data = response.json()
+    store.put_http_response(url, data, etag=response.headers.get("ETag"), status=response.status_code)
+    return data
 
 def get_user_data(username, token):
     url = f"https://api.github.com/users/{username}"
     return github_request(url, token)
 
-def get_repos_data(username, token):
-    url = f"https://api.github.com/users/{username}/repos?per_page=100&sort=updated"
+REPOS_PER_PAGE = 100
+
+def get_repos_page(username, token, page):
+    url = f"https://api.github.com/users/{username}/repos?per_page={REPOS_PER_PAGE}&sort=updated&page={page}"
     return github_request(url, token)
 
+def get_org_repos_page(org, token, page):
+    url = f"https://api.github.com/orgs/{org}/repos?per_page={REPOS_PER_PAGE}&sort=updated&page={page}"
+    return github_request(url, token)
+
+def _iter_pages(get_page, owner, token, start_page):
+    # 📚 Walk the pages until GitHub hands back a short one
+    page = start_page
+    while True:
+        repos = get_page(owner, token, page)
+        yield from repos
+        if len(repos) < REPOS_PER_PAGE:
+            return
+        page += 1
+
+def iter_repos(username, token, start_page=1):
+    return _iter_pages(get_repos_page, username, token, start_page)
+
+def iter_org_repos(org, token, start_page=1):
+    return _iter_pages(get_org_repos_page, org, token, start_page)
+
+def get_repos_data(username, token):
+    return list(iter_repos(username, token))
+
 def get_language_stats(repos):
     stats = defaultdict(int)
     for repo in repos:
@@ -42,16 +80,40 @@ def get_top_starred_repo(repos):
         return None
     return max(repos, key=lambda r: r.get("stargazers_count", 0))
 
+def _probe_commits(username, repo, token):
+    url = f"https://api.github.com/repos/{username}/{repo['name']}/commits"
+    try:
+        commits = github_request(url, token)
+        return commits[0] if commits else None
+    except Exception:
+        return None
+
 def get_latest_commit(username, repos, token):
     for repo in repos:
         if repo.get("fork"):
             continue
-        repo_name = repo["name"]
-        url = f"https://api.github.com/repos/{username}/{repo_name}/commits"
-        try:
-            commits = github_request(url, token)
-            if commits:
-                return commits[0]
-        except Exception:
-            continue
+        commit = _probe_commits(username, repo, token)
+        if commit:
+            return commit
+    return None
+
+async def get_latest_commit_async(username, repos, token, batch_size=5):
+    """
+    Same result as get_latest_commit. The first repo usually has commits, so it's
+    probed alone; only after a miss does the batch grow (1, 2, 4, ... up to
+    ``batch_size`` repos probed concurrently), keeping the common case at one request.
+    """
+    candidates = [repo for repo in repos if not repo.get("fork")]
+    start, size = 0, 1
+    while start < len(candidates):
+        batch = candidates[start:start + size]
+        results = await asyncio.gather(*(
+            asyncio.to_thread(_probe_commits, username, repo, token) for repo in batch
+        ))
+        # Keep the repo order so the answer matches the sequential probe
+        for commit in results:
+            if commit:
+                return commit
+        start += size
+        size = min(size * 2, batch_size)
     return None
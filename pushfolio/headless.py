@@ -0,0 +1,66 @@
+# pushfolio/headless.py
+
+import json
+import os
+import sys
+
+ENV_VAR = "PUSHFOLIO_NONINTERACTIVE"
+USERNAME_ENV_VAR = "PUSHFOLIO_GITHUB_USERNAME"
+
+# 🤖 What to do when the AI bio fails and nobody is around to pick an option
+AI_FAILURE_POLICIES = ("cached", "fallback", "skip", "fail")
+DEFAULT_AI_FAILURE_POLICY = "fallback"
+
+EXIT_CODE = 2
+
+_state = {"enabled": False}
+
+
+class HeadlessError(Exception):
+    """A prompt was needed in headless mode. Carries a stable ``code`` for scripts."""
+
+    def __init__(self, code, message, hint=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.hint = hint
+
+    def to_dict(self):
+        data = {"error": self.code, "message": self.message}
+        if self.hint:
+            data["hint"] = self.hint
+        return data
+
+
+def enable(value=True):
+    _state["enabled"] = value
+
+
+def enabled():
+    """True when --headless was passed or PUSHFOLIO_NONINTERACTIVE is set to a truthy value."""
+    if _state["enabled"]:
+        return True
+    return os.getenv(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def fail(code, message, hint=None):
+    raise HeadlessError(code, message, hint)
+
+
+def ai_failure_policy(settings):
+    """The configured ``ai_failure_policy``; an unknown value fails instead of falling back silently."""
+    policy = settings.get("ai_failure_policy", DEFAULT_AI_FAILURE_POLICY)
+    if policy not in AI_FAILURE_POLICIES:
+        fail(
+            "invalid_policy",
+            f"Unknown ai_failure_policy {policy!r}",
+            hint=f"Set ai_failure_policy to one of: {', '.join(AI_FAILURE_POLICIES)}"
+        )
+    return policy
+
+
+def report(error, stream=None):
+    """Print the error as one JSON line (stderr by default) for CI logs and batch drivers."""
+    stream = stream or sys.stderr
+    stream.write(json.dumps(error.to_dict()) + "\n")
+    stream.flush()
@@ -1,4 +1,4 @@
-import requests
+from . import metrics, replay, store
 
 def get_language_stats(username, token=None):
     headers = {}
@@ -6,7 +6,7 @@ def get_language_stats(username, token=None):
         headers["Authorization"] = f"token {token}"
 
     repos_url = f"https://api.github.com/users/{username}/repos?per_page=100"
-    response = requests.get(repos_url, headers=headers)
+    response = replay.http_get(repos_url, headers=headers)
     repos = response.json()
 
     if not isinstance(repos, list):
@@ -17,9 +17,15 @@ def get_language_stats(username, token=None):
     for repo in repos:
         if repo.get("fork"):
             continue
-        lang_url = repo["languages_url"]
-        lang_response = requests.get(lang_url, headers=headers)
-        repo_langs = lang_response.json()
+        # 🗃️ Reuse stored languages until the repo gets a new push
+        repo_key = repo.get("full_name") or repo["name"]
+        repo_langs = store.get_repo_languages(repo_key, repo.get("pushed_at"))
+        metrics.record_cache("repo_languages", repo_langs is not None)
+        if repo_langs is None:
+            lang_url = repo["languages_url"]
+            lang_response = replay.http_get(lang_url, headers=headers)
+            repo_langs = lang_response.json()
+            store.put_repo_languages(repo_key, repo_langs, repo.get("pushed_at"))
         for lang, bytes in repo_langs.items():
             language_totals[lang] = language_totals.get(lang, 0) + bytes
 
@@ -1,28 +1,115 @@
+import hashlib
 import os
+import re
 import sys
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from functools import lru_cache
+from markupsafe import Markup
+from markdown_it import MarkdownIt  # ships with rich
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound, meta, nodes, pass_context, select_autoescape
 
 # ✅ Ensure pushfolio.plugins can be found even if run directly
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from pushfolio.plugins import discover_plugins
+from pushfolio import metrics
+from pushfolio.plugins import discover_plugins, run_sandboxed_plugins
+from pushfolio.ranking import rank_repos
+
+TEMPLATES_DIR = "templates"
 
 # 🔧 Custom filter: join socials as inline markdown links
 def inline_links(socials_dict):
     return " • ".join(f"[{label}]({url})" for label, url in socials_dict.items())
 
-def build_readme(user, repos, languages, top_repo, latest_commit, settings):
-    env = Environment(loader=FileSystemLoader("templates"))
+# 🔧 Custom filter for HTML templates: {{ block | md }} renders Markdown (e.g. plugin output)
+# Raw HTML in the Markdown is escaped, and the <!-- Plugin: ... --> markers are dropped
+_md = MarkdownIt("commonmark", {"html": False}).enable("table")
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.S)
+
+def md(text):
+    return Markup(_md.render(_HTML_COMMENT.sub("", text or "")))
+
+# 📊 Template helper: {{ chart("languages", "My languages") }} → image link, or "" if not generated
+@pass_context
+def chart(ctx, name, alt=None):
+    path = (ctx.get("charts") or {}).get(name)
+    return f"![{alt or name}]({path})" if path else ""
+
+@lru_cache(maxsize=None)
+def get_env(templates_dir=TEMPLATES_DIR):
+    """Shared Jinja environment (templates are compiled once and reused)."""
+    # HTML targets (templates/*.html) are autoescaped; Markdown templates are left as-is
+    env = Environment(loader=FileSystemLoader(templates_dir), autoescape=select_autoescape(["html"]))
     env.filters["inline_links"] = inline_links
+    env.filters["md"] = md
+    env.globals["chart"] = chart
+    return env
 
-    template_file = settings.get("template", "default.md")
+# 🗺️ Which data each template variable depends on ("user" is always fetched)
+VARIABLE_DATA = {
+    "top_repo": {"repos"},
+    "languages": {"repos"},
+    "rankings": {"repos", "rankings"},
+    "latest_commit": {"repos", "latest_commit"},
+    "activity": {"activity"},
+    "charts": {"repos", "charts"},
+    "chart": {"repos", "charts"},
+    "plugin_blocks": {"repos", "template_plugins"},
+}
+ALL_DATA = frozenset().union(*VARIABLE_DATA.values())
+
+# Settings that switch a piece of data off regardless of the template
+DATA_FLAGS = {
+    "latest_commit": "show_latest_commit",
+    "activity": "show_activity",
+    "charts": "show_charts",
+    "rankings": "show_repo_tables",
+}
+
+_plan_cache = {}
 
+def template_requirements(template_file):
+    """
+    Data a template actually uses, from jinja2.meta on its parsed source.
+    Cached per template content hash, so edits are picked up automatically.
+    ``None`` (e.g. the JSON snapshot target) needs everything.
+    """
+    if template_file is None:
+        return ALL_DATA
+    env = get_env()
     try:
-        template = env.get_template(template_file)
+        source = env.loader.get_source(env, template_file)[0]
     except TemplateNotFound:
-        return f"❌ Template '{template_file}' not found in /templates. Please check your config."
+        return ALL_DATA
 
+    key = (template_file, hashlib.sha256(source.encode("utf-8")).hexdigest())
+    if key not in _plan_cache:
+        parsed = env.parse(source)
+        names = meta.find_undeclared_variables(parsed)
+        # Globals such as chart() aren't "undeclared", so look for them by name
+        names |= {node.name for node in parsed.find_all(nodes.Name) if node.name in env.globals}
+        needed = set()
+        for name in names:
+            needed |= VARIABLE_DATA.get(name, set())
+        _plan_cache[key] = frozenset(needed)
+    return _plan_cache[key]
+
+def data_plan(template_file, settings):
+    """template_requirements() minus anything the config has switched off."""
+    needed = set(template_requirements(template_file))
+    for data, flag in DATA_FLAGS.items():
+        if not settings.get(flag, True):
+            needed.discard(data)
+    return needed
+
+def build_context(user, repos, languages, top_repo, latest_commit, settings, rankings=None, activity=None,
+                  run_plugins=True):
+    """
+    Template-independent render context, including the plugin blocks.
+    ``rankings`` can be passed in precomputed (e.g. across orgs); otherwise it's built from ``repos``.
+    ``activity`` is the summary from activity.get_activity(), if it was fetched.
+    ``run_plugins=False`` skips the plugin blocks for templates that don't show them.
+    """
     context = {
         "name": user.get("name") or user.get("login", "GitHub User"),
         "bio": settings.get("bio") or user.get("bio") or "💻 Passionate developer on GitHub.",
@@ -32,6 +119,9 @@ def build_readme(user, repos, languages, top_repo, latest_commit, settings):
         "socials": {},
         "top_repo": None,
         "latest_commit": None,
+        "rankings": {},
+        "activity": None,
+        "charts": {},
         "plugin_blocks": []
     }
 
@@ -73,15 +163,95 @@ def build_readme(user, repos, languages, top_repo, latest_commit, settings):
             "date": formatted_date
         }
 
+    if settings.get("show_repo_tables", True):
+        if rankings is None:
+            rankings = rank_repos(repos or [], settings.get("repo_table_size", 10))
+        context["rankings"] = rankings
+
+    if settings.get("show_activity", True) and activity:
+        context["activity"] = activity
+
+    if not run_plugins:
+        return context
+
+    if settings.get("plugin_sandbox", True):
+        # 🧪 Plugins run in the rlimited worker pool, not in this process
+        for name, block, error, usage in run_sandboxed_plugins(user, repos, settings):
+            if error:
+                context["plugin_blocks"].append(f"<!-- Plugin Error: {name} - {error} -->")
+            else:
+                context["plugin_blocks"].append(f"<!-- Plugin: {name} -->\n{block.strip()}")
+            metrics.record_plugin(name, error, usage)
+        return context
+
     for name, plugin_fn in discover_plugins():
         try:
             block = plugin_fn(user, repos, settings)
             context["plugin_blocks"].append(f"<!-- Plugin: {name} -->\n{block.strip()}")
+            metrics.record_plugin(name)
         except Exception as e:
             context["plugin_blocks"].append(f"<!-- Plugin Error: {name} - {e} -->")
+            metrics.record_plugin(name, e)
+
+    return context
+
+def render_template(template_file, context):
+    """Render one template against a prepared context from build_context()."""
+    env = get_env()
+
+    try:
+        template = env.get_template(template_file)
+    except TemplateNotFound:
+        return f"❌ Template '{template_file}' not found in /templates. Please check your config."
 
     try:
         rendered = template.render(**context)
         return rendered.strip()
     except Exception as e:
         return f"❌ Template rendering failed: {str(e)}"
+
+def _strip_stream(chunks):
+    # Streaming equivalent of str.strip(): hold back trailing whitespace until more text arrives
+    started = False
+    pending = ""
+    for chunk in chunks:
+        # Autoescaped (HTML) templates yield Markup; plain str keeps the concatenation below from re-escaping
+        chunk = str(chunk)
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        body = chunk.rstrip()
+        if body:
+            yield pending + body
+            pending = chunk[len(body):]
+        else:
+            pending += chunk
+
+class TemplateRenderError(Exception):
+    """A template was missing or raised while streaming; nothing should be written."""
+
+def stream_template(template_file, context):
+    """
+    Like render_template(), but yields the output in chunks via Jinja's generate().
+    Errors are raised (as TemplateRenderError) rather than yielded, so a writer
+    such as atomic_write() drops the partial output and keeps the old file.
+    """
+    env = get_env()
+
+    try:
+        template = env.get_template(template_file)
+    except TemplateNotFound:
+        raise TemplateRenderError(f"Template '{template_file}' not found in /templates. Please check your config.")
+
+    try:
+        yield from _strip_stream(template.generate(**context))
+    except Exception as e:
+        raise TemplateRenderError(f"Template rendering failed: {e}") from e
+
+def build_readme(user, repos, languages, top_repo, latest_commit, settings):
+    template_file = settings.get("template", "default.md")
+    run_plugins = "template_plugins" in template_requirements(template_file)
+    context = build_context(user, repos, languages, top_repo, latest_commit, settings, run_plugins=run_plugins)
+    return render_template(template_file, context)
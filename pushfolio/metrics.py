@@ -0,0 +1,202 @@
+# pushfolio/metrics.py
+
+import copy
+import json
+import threading
+import time
+from contextlib import contextmanager
+from .output import atomic_write
+
+# 📈 One report per run; every layer records into it (worker threads included)
+_lock = threading.Lock()
+_report = {}
+# ⏳ (resource, reset time) → [max remaining, min remaining] seen in that rate-limit window
+_rate_windows = {}
+
+
+def _new_report(command):
+    return {
+        "command": command,
+        "started_at": time.time(),
+        "duration_seconds": None,
+        "success": None,
+        "error": None,
+        "http": {"requests": 0, "bytes": 0, "not_modified": 0, "errors": 0, "by_status": {}},
+        "rate_limit": {},
+        "cache": {},
+        "stages": {},
+        "plugins": {"run": 0, "failed": 0, "failures": [], "resources": {}},
+        "readme_changed": None,
+    }
+
+
+def start(command):
+    global _report
+    with _lock:
+        _report = _new_report(command)
+        _rate_windows.clear()
+        _report["_t0"] = time.perf_counter()
+
+
+def _ensure():
+    if not _report:
+        start(None)
+
+
+def record_http(url, status, nbytes, headers=None):
+    _ensure()
+    with _lock:
+        http = _report["http"]
+        http["requests"] += 1
+        http["bytes"] += nbytes
+        http["by_status"][str(status)] = http["by_status"].get(str(status), 0) + 1
+        if status == 304:
+            http["not_modified"] += 1
+        elif status >= 400:
+            http["errors"] += 1
+
+        # ⏳ Track the rate-limit budget per resource (core, search, ...). Responses
+        # arrive out of order (concurrent pages/probes), so the spend in a window is
+        # the spread between the highest and lowest "remaining" seen, not first - last
+        headers = headers or {}
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            resource = headers.get("X-RateLimit-Resource", "core")
+            limit = int(headers.get("X-RateLimit-Limit", 0))
+            reset = int(headers.get("X-RateLimit-Reset", 0))
+            remaining = int(remaining)
+
+            window = _rate_windows.setdefault((resource, reset), [remaining, remaining])
+            window[0] = max(window[0], remaining)
+            window[1] = min(window[1], remaining)
+
+            windows = {r: w for (res, r), w in _rate_windows.items() if res == resource}
+            latest = windows[max(windows)]
+            _report["rate_limit"][resource] = {
+                "limit": limit,
+                "remaining": latest[1],
+                "reset": max(windows),
+                "used": sum(high - low + 1 for high, low in windows.values()),
+            }
+
+
+def record_cache(name, hit):
+    _ensure()
+    with _lock:
+        entry = _report["cache"].setdefault(name, {"hits": 0, "misses": 0})
+        entry["hits" if hit else "misses"] += 1
+
+
+def record_plugin(name, error=None, usage=None):
+    _ensure()
+    with _lock:
+        plugins = _report["plugins"]
+        plugins["run"] += 1
+        if error is not None:
+            plugins["failed"] += 1
+            plugins["failures"].append({"plugin": name, "error": str(error)})
+        # 🧪 Sandboxed plugins also report what they cost
+        if usage:
+            entry = plugins["resources"].setdefault(name, {"cpu_seconds": 0.0, "wall_seconds": 0.0, "rss_growth_kb": 0})
+            entry["cpu_seconds"] = round(entry["cpu_seconds"] + usage.get("cpu_seconds", 0.0), 6)
+            entry["wall_seconds"] = round(entry["wall_seconds"] + usage.get("wall_seconds", 0.0), 6)
+            # Largest rise in the worker's peak RSS during one call of this plugin
+            entry["rss_growth_kb"] = max(entry["rss_growth_kb"], usage.get("rss_growth_kb", 0))
+
+
+def set_value(key, value):
+    _ensure()
+    with _lock:
+        _report[key] = value
+
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage. Overlapping (concurrent) stages are each timed on their own."""
+    _ensure()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _report["stages"][name] = round(_report["stages"].get(name, 0) + elapsed, 6)
+
+
+def finish(success=None, error=None):
+    """Close the report. ``success`` defaults to True unless a layer already marked the run failed."""
+    _ensure()
+    with _lock:
+        if success is None:
+            success = _report["success"] is not False
+        _report["success"] = success
+        if error:
+            _report["error"] = str(error)
+        _report["duration_seconds"] = round(time.perf_counter() - _report.get("_t0", time.perf_counter()), 6)
+        for entry in _report["cache"].values():
+            total = entry["hits"] + entry["misses"]
+            entry["hit_rate"] = round(entry["hits"] / total, 4) if total else None
+    return snapshot()
+
+
+def snapshot():
+    """A deep copy, so a returned report doesn't change as later runs record."""
+    with _lock:
+        return copy.deepcopy({k: v for k, v in _report.items() if not k.startswith("_")})
+
+
+# 📤 Exporters
+
+def write_json(path, report=None):
+    report = report or snapshot()
+    atomic_write(path, [json.dumps(report, indent=2, sort_keys=True)])
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def to_prometheus(report=None):
+    """Render the report in the Prometheus text exposition format (for node_exporter's textfile collector)."""
+    report = report or snapshot()
+    cmd = f'command="{_label(report.get("command") or "")}"'
+    lines = []
+
+    def metric(name, help_text, kind, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_str = ",".join([cmd] + labels)
+            lines.append(f"{name}{{{label_str}}} {value}")
+
+    http = report["http"]
+    metric("pushfolio_run_success", "1 if the last run succeeded", "gauge",
+           [([], 1 if report.get("success") else 0)])
+    metric("pushfolio_run_duration_seconds", "Wall time of the last run", "gauge",
+           [([], report.get("duration_seconds") or 0)])
+    metric("pushfolio_run_timestamp_seconds", "Unix time the last run started", "gauge",
+           [([], report.get("started_at") or 0)])
+    metric("pushfolio_http_requests", "HTTP requests made by the last run", "gauge",
+           [([f'status="{status}"'], count) for status, count in sorted(http["by_status"].items())] or [([], 0)])
+    metric("pushfolio_http_bytes", "Response bytes received by the last run", "gauge",
+           [([], http["bytes"])])
+    metric("pushfolio_ratelimit_used", "GitHub rate-limit budget consumed by the last run", "gauge",
+           [([f'resource="{_label(r)}"'], e.get("used", 0)) for r, e in sorted(report["rate_limit"].items())])
+    metric("pushfolio_ratelimit_remaining", "GitHub rate-limit budget left after the last run", "gauge",
+           [([f'resource="{_label(r)}"'], e["remaining"]) for r, e in sorted(report["rate_limit"].items())])
+    metric("pushfolio_cache_hits", "Cache hits in the last run", "gauge",
+           [([f'cache="{_label(c)}"'], e["hits"]) for c, e in sorted(report["cache"].items())])
+    metric("pushfolio_cache_misses", "Cache misses in the last run", "gauge",
+           [([f'cache="{_label(c)}"'], e["misses"]) for c, e in sorted(report["cache"].items())])
+    metric("pushfolio_stage_seconds", "Per-stage latency of the last run", "gauge",
+           [([f'stage="{_label(s)}"'], t) for s, t in sorted(report["stages"].items())])
+    metric("pushfolio_plugin_failures", "Plugins that raised in the last run", "gauge",
+           [([], report["plugins"]["failed"])])
+    changed = report.get("readme_changed")
+    metric("pushfolio_readme_changed", "1 if the last run rewrote the README", "gauge",
+           [([], 1 if changed else 0)])
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, report=None):
+    atomic_write(path, [to_prometheus(report)])
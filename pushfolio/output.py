@@ -0,0 +1,72 @@
+# pushfolio/output.py
+
+import os
+import tempfile
+
+
+def _same_prefix(existing, data):
+    if existing is None:
+        return False
+    return existing.read(len(data)) == data
+
+
+def atomic_write(path, chunks, encoding="utf-8"):
+    """
+    Stream ``chunks`` into a temp file next to ``path`` and swap it in with os.replace.
+
+    The new bytes are compared with the current file as they are written; if nothing
+    changed the temp file is dropped and the original is left untouched.
+    Returns True when ``path`` was (re)written.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+
+    try:
+        existing = open(path, "rb") if os.path.exists(path) else None
+    except OSError:
+        existing = None
+
+    try:
+        unchanged = existing is not None
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                data = chunk.encode(encoding) if isinstance(chunk, str) else chunk
+                if unchanged:
+                    unchanged = _same_prefix(existing, data)
+                f.write(data)
+            if unchanged:
+                # Same prefix so far; only a no-op if the old file has nothing left over
+                unchanged = existing.read(1) == b""
+            if not unchanged:
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Close before replacing: Windows won't swap a file that's still open
+        if existing is not None:
+            existing.close()
+            existing = None
+
+        if unchanged:
+            os.remove(tmp_path)
+            return False
+
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if existing is not None:
+            existing.close()
+
+
+def stream_write(stream, chunks):
+    """Write ``chunks`` straight to an open text stream (e.g. stdout for piping)."""
+    for chunk in chunks:
+        stream.write(chunk)
+    stream.flush()
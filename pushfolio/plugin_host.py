@@ -0,0 +1,321 @@
+# pushfolio/plugin_host.py
+
+import ast
+import atexit
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # Windows: plugins still run out-of-process, just without rlimits
+    resource = None
+
+DEFAULT_WORKERS = 2
+DEFAULT_MEMORY_MB = 512
+DEFAULT_CPU_SECONDS = 5
+DEFAULT_MAX_TASKS = 50
+
+# Entry points a plugin can expose (see plugins/Readme.md)
+ENTRY_POINTS = ("run", "register")
+
+
+class PluginLimitExceeded(Exception):
+    """A plugin ran past its CPU or memory budget."""
+
+
+# 🔍 Static inspection (runs in the parent, never executes plugin code)
+
+_inspect_cache = {}
+
+
+def inspect_plugin(path):
+    """
+    Read a plugin's entry points and its optional ``CONTEXT_FIELDS`` declaration
+    with ``ast`` so the parent process never imports untrusted code.
+    """
+    stamp = os.stat(path).st_mtime_ns
+    cached = _inspect_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    entries = set()
+    fields = None
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in ENTRY_POINTS:
+            entries.add(node.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == "CONTEXT_FIELDS":
+                    try:
+                        fields = tuple(ast.literal_eval(node.value))
+                    except ValueError:
+                        fields = None
+
+    info = {"entries": entries, "fields": fields}
+    _inspect_cache[path] = (stamp, info)
+    return info
+
+
+def slim_payload(context, fields):
+    """Only ship the declared fields across the process boundary (all of them if undeclared)."""
+    if fields is None:
+        return dict(context)
+    return {field: context.get(field) for field in fields}
+
+
+# 🧪 Worker side
+
+_worker = {"modules": {}, "cpu_seconds": None}
+
+
+def _on_cpu_limit(signum, frame):
+    raise PluginLimitExceeded("CPU time limit exceeded")
+
+
+def _init_worker(memory_mb, cpu_seconds, max_tasks):
+    _worker["cpu_seconds"] = cpu_seconds
+    # Ctrl+C is handled by the parent; workers just get torn down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if resource is None:
+        return
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+        # Hard cap for the worker's whole (recycled) lifetime; per-task budgets use the soft limit
+        lifetime = int(cpu_seconds * (max_tasks or DEFAULT_MAX_TASKS) + cpu_seconds + 5)
+        resource.setrlimit(resource.RLIMIT_CPU, (lifetime, lifetime))
+
+
+def _cpu_used():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _load(path):
+    import importlib.util
+
+    stamp = os.stat(path).st_mtime_ns
+    cached = _worker["modules"].get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    name = "pushfolio_plugin_" + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _worker["modules"][path] = (stamp, module)
+    return module
+
+
+def _execute(path, entry, payload):
+    started = time.perf_counter()
+    cpu_before = _cpu_used() if resource else 0.0
+    # ru_maxrss is the worker's lifetime peak, so report how much this task raised it
+    peak_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+    cpu_seconds = _worker["cpu_seconds"]
+
+    if resource and cpu_seconds:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = min(int(cpu_before + cpu_seconds) + 1, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+    output = error = None
+    try:
+        module = _load(path)
+        if entry == "register":
+            output = module.register(payload.get("user"), payload.get("repos"), payload.get("settings"))
+        else:
+            output = module.run(payload)
+        if output is not None and not isinstance(output, str):
+            output = str(output)
+    except MemoryError:
+        error = "Memory limit exceeded"
+    except PluginLimitExceeded as e:
+        error = str(e)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        if resource and cpu_seconds:
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+    usage = {"wall_seconds": time.perf_counter() - started, "cpu_seconds": 0.0, "rss_growth_kb": 0}
+    if resource:
+        usage["cpu_seconds"] = _cpu_used() - cpu_before
+        usage["rss_growth_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - peak_before
+    return {"output": output, "error": error, "usage": usage, "pid": os.getpid()}
+
+
+# 🏠 Parent side
+
+class PluginHost:
+    """A persistent, rlimited worker pool that runs plugins out of process."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, memory_mb=DEFAULT_MEMORY_MB,
+                 cpu_seconds=DEFAULT_CPU_SECONDS, max_tasks=DEFAULT_MAX_TASKS):
+        self.workers = workers
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.max_tasks = max_tasks
+        self._pool = None
+        self._lock = threading.Lock()
+        # Batches (run_many calls) currently using each pool; generate runs two at once
+        self._in_flight = {}
+        self._retired = set()
+
+    def _new_pool(self, workers=None):
+        kwargs = {
+            "max_workers": workers or self.workers,
+            # spawn: workers start clean instead of inheriting the parent's memory and threads
+            "mp_context": multiprocessing.get_context("spawn"),
+            "initializer": _init_worker,
+            "initargs": (self.memory_mb, self.cpu_seconds, self.max_tasks),
+        }
+        try:
+            return ProcessPoolExecutor(max_tasks_per_child=self.max_tasks, **kwargs)
+        except TypeError:  # Python < 3.11 can't recycle workers
+            return ProcessPoolExecutor(**kwargs)
+
+    def _acquire(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._new_pool()
+            pool = self._pool
+            self._in_flight[pool] = self._in_flight.get(pool, 0) + 1
+            return pool
+
+    def _retire(self, pool):
+        # New batches get a fresh pool; this one is killed once no batch is using it
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+            self._retired.add(pool)
+
+    def _release(self, pool):
+        with self._lock:
+            self._in_flight[pool] -= 1
+            if self._in_flight[pool]:
+                return
+            del self._in_flight[pool]
+            if pool not in self._retired:
+                return
+            self._retired.discard(pool)
+        self._kill(pool)
+
+    @staticmethod
+    def _kill(pool):
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _timeout(self):
+        # A plugin blocked on I/O doesn't burn CPU, so also cap wall time
+        return (self.cpu_seconds or DEFAULT_CPU_SECONDS) * 3 + 10
+
+    def run_many(self, jobs):
+        """
+        ``jobs`` is a list of (name, path, entry, context). Returns one result dict
+        per job, in order: {"name", "output", "error", "usage"}.
+        """
+        if not jobs:
+            return []
+
+        pool = self._acquire()
+        try:
+            results, crashed, broken = self._run_batch(pool, jobs)
+            if broken:
+                self._retire(pool)
+        finally:
+            self._release(pool)
+
+        # The crash may have come from a plugin in another batch sharing the pool: give each
+        # of these jobs one more go alone in its own worker, so only the real crasher fails again
+        for i in crashed:
+            private = self._new_pool(workers=1)
+            try:
+                retried, _, _ = self._run_batch(private, [jobs[i]])
+            finally:
+                self._kill(private)
+            results[i] = retried[0]
+
+        for (name, _, _, _), result in zip(jobs, results):
+            result["name"] = name
+        return results
+
+    def _run_batch(self, pool, jobs):
+        """Returns (results, indexes of the jobs whose worker crashed, whether the pool is unusable)."""
+        results = []
+        crashed = []
+        submitted = []
+        for name, path, entry, context in jobs:
+            try:
+                fields = inspect_plugin(path)["fields"]
+                future = pool.submit(_execute, path, entry, slim_payload(context, fields))
+            except BrokenProcessPool:
+                future = None
+            except Exception as e:
+                future = e
+            submitted.append(future)
+
+        broken = False
+        for i, future in enumerate(submitted):
+            if isinstance(future, Exception):
+                result = {"output": None, "error": str(future), "usage": {}}
+            else:
+                try:
+                    if future is None:
+                        raise BrokenProcessPool()
+                    result = future.result(timeout=self._timeout())
+                except FutureTimeout:
+                    result = {"output": None, "error": "Timed out", "usage": {}}
+                    broken = True
+                except BrokenProcessPool:
+                    # A worker was killed outright (e.g. hard CPU limit); start fresh next time
+                    result = {"output": None, "error": "Plugin worker crashed", "usage": {}}
+                    crashed.append(i)
+                    broken = True
+                except Exception as e:
+                    result = {"output": None, "error": str(e), "usage": {}}
+            results.append(result)
+
+        return results, crashed, broken
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_host = {"instance": None, "key": None}
+
+
+def get_host(settings):
+    """Shared host for the process (batch and daemon runs reuse the same warm workers)."""
+    key = (
+        settings.get("plugin_workers", DEFAULT_WORKERS),
+        settings.get("plugin_memory_mb", DEFAULT_MEMORY_MB),
+        settings.get("plugin_cpu_seconds", DEFAULT_CPU_SECONDS),
+        settings.get("plugin_max_tasks", DEFAULT_MAX_TASKS),
+    )
+    if _host["instance"] is None or _host["key"] != key:
+        if _host["instance"] is not None:
+            _host["instance"].shutdown()
+        _host["instance"] = PluginHost(*key)
+        _host["key"] = key
+    return _host["instance"]
+
+
+@atexit.register
+def _shutdown_host():
+    if _host["instance"] is not None:
+        _host["instance"].shutdown()
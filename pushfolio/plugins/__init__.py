@@ -6,12 +6,40 @@ from rich.console import Console
 
 console = Console()
 
-def discover_plugins():
+def _plugin_files():
     plugin_folder = os.path.dirname(__file__)
-    plugin_files = [
+    return [
         f for f in os.listdir(plugin_folder)
         if f.endswith(".py") and f != "__init__.py"
     ]
+
+def run_sandboxed_plugins(user, repos, settings):
+    """
+    Run every plugin's register() in the out-of-process plugin host.
+    Returns (name, block, error, usage) tuples; plugin code never runs in this process.
+    """
+    from pushfolio import plugin_host
+
+    plugin_folder = os.path.dirname(__file__)
+    jobs = []
+    for file in _plugin_files():
+        name = file[:-3]
+        path = os.path.join(plugin_folder, file)
+        try:
+            entries = plugin_host.inspect_plugin(path)["entries"]
+        except Exception as e:
+            console.print(f"[red]❌ Failed to load plugin '{name}': {e}[/red]")
+            continue
+        if "register" not in entries:
+            console.print(f"[yellow]⚠️ Plugin '{name}' skipped: missing register()[/yellow]")
+            continue
+        jobs.append((name, path, "register", {"user": user, "repos": repos, "settings": settings}))
+
+    host = plugin_host.get_host(settings)
+    return [(r["name"], r["output"] or "", r["error"], r["usage"]) for r in host.run_many(jobs)]
+
+def discover_plugins():
+    plugin_files = _plugin_files()
     plugins = []
     for file in plugin_files:
         name = file[:-3]  # strip .py
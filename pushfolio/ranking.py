@@ -0,0 +1,58 @@
+# pushfolio/ranking.py
+
+import heapq
+from datetime import datetime
+
+DEFAULT_TOP_K = 10
+
+# 🏆 Each view: (sort key, whether forks count)
+VIEWS = {
+    "top_starred": (lambda r: r.get("stargazers_count", 0), True),
+    "most_forked": (lambda r: r.get("forks_count", 0), True),
+    "recently_active": (lambda r: r.get("pushed_at") or "", False),
+}
+
+
+def _summary(repo):
+    pushed = repo.get("pushed_at")
+    if pushed:
+        pushed = datetime.strptime(pushed, "%Y-%m-%dT%H:%M:%SZ").strftime("%d %b %Y")
+    return {
+        "name": repo.get("full_name") or repo["name"],
+        "url": repo.get("html_url", ""),
+        "stars": repo.get("stargazers_count", 0),
+        "forks": repo.get("forks_count", 0),
+        "language": repo.get("language"),
+        "description": repo.get("description") or "",
+        "pushed_at": pushed,
+    }
+
+
+def rank_repos(repos, k=DEFAULT_TOP_K, views=None):
+    """
+    Compute every top-``k`` view in a single pass over ``repos`` (any iterable,
+    e.g. fetch.iter_repos), keeping one bounded min-heap per view.
+    """
+    views = views or list(VIEWS)
+    heaps = {view: [] for view in views}
+
+    if k <= 0:
+        return {view: [] for view in views}
+
+    for index, repo in enumerate(repos):
+        for view in views:
+            key_fn, include_forks = VIEWS[view]
+            if repo.get("fork") and not include_forks:
+                continue
+            # -index: on ties the earlier repo wins, like max()/sorted() would
+            entry = (key_fn(repo), -index, repo)
+            heap = heaps[view]
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    return {
+        view: [_summary(repo) for _, _, repo in sorted(heap, key=lambda e: e[:2], reverse=True)]
+        for view, heap in heaps.items()
+    }
@@ -0,0 +1,156 @@
+# pushfolio/replay.py
+
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import metrics, store
+from .output import atomic_write
+
+# 🎞️ Transport mode shared by the GitHub and OpenAI layers: None, "record" or "replay"
+_state = {"mode": None, "dir": None, "latency": None, "scratch": None}
+
+# Cassettes aren't keyed on the token, so replays run with this stand-in
+REPLAY_TOKEN = "ghp_replay_token"
+
+# Conditional headers would record bodiless 304s, so they're dropped while recording
+_UNRECORDED_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class CassetteMissing(requests.exceptions.ConnectionError):
+    """Replay mode was asked for a request that was never recorded."""
+
+
+def configure(mode=None, directory=None, latency=None):
+    """
+    ``latency`` (replay only): None for no delay, "recorded" to sleep for the
+    recorded duration, or a number of seconds to sleep per request.
+    """
+    if mode not in (None, "record", "replay"):
+        raise ValueError(f"Unknown replay mode: {mode}")
+    if mode == "record":
+        os.makedirs(directory, exist_ok=True)
+    elif mode == "replay" and not os.path.isdir(directory):
+        raise FileNotFoundError(f"Cassette directory not found: {directory}")
+    _state.update(mode=mode, dir=directory, latency=latency)
+    _use_scratch_store(mode is not None)
+
+
+def _use_scratch_store(scratch):
+    # 🗃️ Record/replay start from an empty state db: a warm cache would skip requests
+    # (incomplete cassettes, replays that depend on the machine) and replayed ETags
+    # must not end up in the live HTTP cache
+    if _state["scratch"] is not None:
+        store.use_scratch(None)
+        shutil.rmtree(_state["scratch"], ignore_errors=True)
+        _state["scratch"] = None
+    if scratch:
+        _state["scratch"] = tempfile.mkdtemp(prefix="pushfolio-replay-")
+        store.use_scratch(_state["scratch"])
+
+
+@atexit.register
+def _remove_scratch_store():
+    if _state["scratch"]:
+        store.close()
+        shutil.rmtree(_state["scratch"], ignore_errors=True)
+
+
+def replaying():
+    return _state["mode"] == "replay"
+
+
+def _cassette_path(kind, key):
+    digest = hashlib.sha1(f"{kind}:{key}".encode("utf-8")).hexdigest()
+    return os.path.join(_state["dir"], f"{kind}-{digest}.json")
+
+
+def _load(kind, key):
+    path = _cassette_path(kind, key)
+    if not os.path.exists(path):
+        raise CassetteMissing(f"No recorded {kind} response for {key} in {_state['dir']}")
+    with open(path, "r", encoding="utf-8") as f:
+        cassette = json.load(f)
+
+    latency = _state["latency"]
+    if latency == "recorded":
+        time.sleep(cassette.get("elapsed", 0))
+    elif latency:
+        time.sleep(float(latency))
+    return cassette
+
+
+def _save(kind, key, cassette):
+    atomic_write(_cassette_path(kind, key), [json.dumps(cassette, indent=2, sort_keys=True)])
+
+
+# 🌐 GitHub (and any other plain HTTP GET)
+
+def http_get(url, headers=None):
+    """Drop-in for requests.get(url, headers=...) that honours record/replay mode."""
+    response = _http_get(url, headers)
+    metrics.record_http(url, response.status_code, len(response.content or b""), response.headers)
+    return response
+
+
+def _http_get(url, headers=None):
+    if _state["mode"] == "replay":
+        cassette = _load("http", url)
+        response = requests.Response()
+        response.status_code = cassette["status"]
+        response.headers = CaseInsensitiveDict(cassette["headers"])
+        response._content = cassette["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+    if _state["mode"] != "record":
+        return requests.get(url, headers=headers)
+
+    headers = {k: v for k, v in (headers or {}).items() if k not in _UNRECORDED_HEADERS}
+    started = time.perf_counter()
+    response = requests.get(url, headers=headers)
+    _save("http", url, {
+        "url": url,
+        "status": response.status_code,
+        "headers": dict(response.headers),
+        "body": response.text,
+        "elapsed": time.perf_counter() - started,
+    })
+    return response
+
+
+# 🤖 OpenAI
+
+def chat_completion(client_call, **kwargs):
+    """
+    Wrap an OpenAI chat completion call (e.g. openai.ChatCompletion.create).
+    Replayed responses expose the same ``choices[0].message.content`` shape.
+    """
+    key = json.dumps(kwargs, sort_keys=True)
+
+    if _state["mode"] == "replay":
+        cassette = _load("openai", key)
+        return SimpleNamespace(choices=[
+            SimpleNamespace(message=SimpleNamespace(content=content)) for content in cassette["choices"]
+        ])
+
+    if _state["mode"] != "record":
+        return client_call(**kwargs)
+
+    started = time.perf_counter()
+    response = client_call(**kwargs)
+    _save("openai", key, {
+        "request": kwargs,
+        "choices": [choice.message.content for choice in response.choices],
+        "elapsed": time.perf_counter() - started,
+    })
+    return response
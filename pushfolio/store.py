@@ -0,0 +1,377 @@
+# pushfolio/store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_STORE_FILE = ".pushfolio_state.db"
+STORE_FILE = DEFAULT_STORE_FILE
+LEGACY_CACHE_FILE = ".pushfolio_cache.json"
+
+# 🧹 Cached HTTP bodies are trimmed (oldest first) past this size
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+# Profile history kept per user (one snapshot per run)
+MAX_SNAPSHOTS = 30
+# ...down to this fraction of it, so a full cache isn't trimmed again on every write
+EVICT_TARGET = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    status INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_http_fetched_at ON http_responses (fetched_at);
+
+CREATE TABLE IF NOT EXISTS profile_snapshots (
+    username TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (username, fetched_at)
+);
+
+CREATE TABLE IF NOT EXISTS repo_languages (
+    repo TEXT PRIMARY KEY,
+    pushed_at TEXT,
+    languages TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ai_bios (
+    username TEXT PRIMARY KEY,
+    bio TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+-- Plugin outputs were never safe to cache (they can depend on time or external APIs)
+DROP TABLE IF EXISTS plugin_outputs;
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    type TEXT NOT NULL,
+    repo TEXT,
+    created_at TEXT NOT NULL,
+    commits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_events_user_created ON events (username, created_at);
+
+CREATE TABLE IF NOT EXISTS charts (
+    path TEXT PRIMARY KEY,
+    data_hash TEXT NOT NULL,
+    rendered_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS outputs (
+    path TEXT PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    written_at REAL NOT NULL
+);
+"""
+
+TABLES = ("http_responses", "profile_snapshots", "repo_languages", "ai_bios", "events", "charts", "outputs")
+
+# One connection per thread; WAL lets batch workers in other processes read while we write
+_local = threading.local()
+
+# 🧮 Running size of the evictable tables per store file, so writes don't re-sum them
+_size_lock = threading.Lock()
+_cached_sizes = {}
+
+
+def connect(path=None):
+    path = path or STORE_FILE
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        conns[path] = conn
+    return conn
+
+
+def use_scratch(directory=None):
+    """
+    Point the store at a fresh throwaway DB (record/replay runs), so neither the
+    live cache's contents nor its ETags leak into or out of the run.
+    ``None`` switches back to the live STORE_FILE.
+    """
+    global STORE_FILE
+    if directory is None:
+        STORE_FILE = DEFAULT_STORE_FILE
+        _legacy["checked"] = False
+        return STORE_FILE
+    STORE_FILE = os.path.join(directory, DEFAULT_STORE_FILE)
+    # The legacy bio cache belongs to the live store
+    _legacy["checked"] = True
+    return STORE_FILE
+
+
+def close():
+    for conn in getattr(_local, "conns", {}).values():
+        conn.close()
+    _local.conns = {}
+
+
+# 🌐 HTTP responses
+
+def get_http_response(url):
+    row = connect().execute(
+        "SELECT etag, status, body, fetched_at FROM http_responses WHERE url = ?", (url,)
+    ).fetchone()
+    if not row:
+        return None
+    etag, status, body, fetched_at = row
+    return {"etag": etag, "status": status, "body": json.loads(body), "fetched_at": fetched_at}
+
+
+def put_http_response(url, body, etag=None, status=200):
+    payload = json.dumps(body)
+    connect().execute(
+        "INSERT OR REPLACE INTO http_responses (url, etag, status, body, size, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (url, etag, status, payload, len(payload), time.time())
+    )
+    _track_write(len(payload))
+
+
+# 👤 Profile snapshots
+
+def put_profile_snapshot(username, data):
+    """Record this run's profile and prune the user's history to the latest MAX_SNAPSHOTS."""
+    conn = connect()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT OR REPLACE INTO profile_snapshots (username, fetched_at, data) VALUES (?, ?, ?)",
+            (username, time.time(), json.dumps(data))
+        )
+        conn.execute(
+            "DELETE FROM profile_snapshots WHERE username = ? AND fetched_at NOT IN "
+            "(SELECT fetched_at FROM profile_snapshots WHERE username = ? ORDER BY fetched_at DESC LIMIT ?)",
+            (username, username, MAX_SNAPSHOTS)
+        )
+
+
+# 🧠 Per-repo languages
+
+def get_repo_languages(repo, pushed_at=None):
+    """Cached languages for ``repo``; misses if the repo was pushed since it was cached."""
+    row = connect().execute(
+        "SELECT pushed_at, languages FROM repo_languages WHERE repo = ?", (repo,)
+    ).fetchone()
+    if not row or (pushed_at and row[0] != pushed_at):
+        return None
+    return json.loads(row[1])
+
+
+def put_repo_languages(repo, languages, pushed_at=None):
+    connect().execute(
+        "INSERT OR REPLACE INTO repo_languages (repo, pushed_at, languages, updated_at) VALUES (?, ?, ?, ?)",
+        (repo, pushed_at, json.dumps(languages), time.time())
+    )
+
+
+# 🤖 AI bios
+
+def get_bio(username):
+    row = connect().execute("SELECT bio FROM ai_bios WHERE username = ?", (username,)).fetchone()
+    if row:
+        return row[0]
+    if _import_legacy_bios():
+        row = connect().execute("SELECT bio FROM ai_bios WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+    return None
+
+
+_legacy = {"checked": False}
+
+
+def _import_legacy_bios():
+    """
+    📦 One-time import from the old whole-file JSON cache. The file is renamed
+    afterwards so later misses (and later runs) don't parse it again.
+    Returns True if anything was imported.
+    """
+    if _legacy["checked"]:
+        return False
+    _legacy["checked"] = True
+    if not os.path.exists(LEGACY_CACHE_FILE):
+        return False
+
+    try:
+        with open(LEGACY_CACHE_FILE, "r") as f:
+            bios = json.load(f)
+    except Exception:
+        return False
+    if not isinstance(bios, dict):
+        return False
+
+    conn = connect()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR IGNORE INTO ai_bios (username, bio, created_at) VALUES (?, ?, ?)",
+            [(username, bio, time.time()) for username, bio in bios.items() if isinstance(bio, str) and bio]
+        )
+    try:
+        os.replace(LEGACY_CACHE_FILE, LEGACY_CACHE_FILE + ".imported")
+    except OSError:
+        pass
+    return True
+
+
+def put_bio(username, bio):
+    connect().execute(
+        "INSERT OR REPLACE INTO ai_bios (username, bio, created_at) VALUES (?, ?, ?)",
+        (username, bio, time.time())
+    )
+
+
+# 📅 Activity events
+
+def latest_event_id(username):
+    row = connect().execute("SELECT MAX(id) FROM events WHERE username = ?", (username,)).fetchone()
+    return row[0]
+
+
+def put_events(username, events):
+    """``events`` are (id, type, repo, created_at, commits) tuples."""
+    conn = connect()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR IGNORE INTO events (id, username, type, repo, created_at, commits) VALUES (?, ?, ?, ?, ?, ?)",
+            [(event_id, username, kind, repo, created_at, commits) for event_id, kind, repo, created_at, commits in events]
+        )
+
+
+def get_events(username, since=None):
+    query = "SELECT type, repo, created_at, commits FROM events WHERE username = ?"
+    params = [username]
+    if since:
+        query += " AND created_at >= ?"
+        params.append(since)
+    return connect().execute(query + " ORDER BY created_at", params)
+
+
+# 📊 Rendered charts
+
+def get_chart_hash(path):
+    row = connect().execute("SELECT data_hash FROM charts WHERE path = ?", (path,)).fetchone()
+    return row[0] if row else None
+
+
+def put_chart_hash(path, data_hash):
+    connect().execute(
+        "INSERT OR REPLACE INTO charts (path, data_hash, rendered_at) VALUES (?, ?, ?)",
+        (path, data_hash, time.time())
+    )
+
+
+# 📤 Output targets
+
+def get_output_hash(path):
+    row = connect().execute("SELECT input_hash FROM outputs WHERE path = ?", (path,)).fetchone()
+    return row[0] if row else None
+
+
+def put_output_hash(path, input_hash):
+    connect().execute(
+        "INSERT OR REPLACE INTO outputs (path, input_hash, written_at) VALUES (?, ?, ?)",
+        (path, input_hash, time.time())
+    )
+
+
+def forget_output_hash(path):
+    connect().execute("DELETE FROM outputs WHERE path = ?", (path,))
+
+
+# 🧹 Maintenance
+
+def _track_write(nbytes):
+    """
+    Add a write to the running total and only evict once it crosses the cap.
+    The total starts from one real count and is an upper bound after that
+    (replaced rows aren't subtracted); evict() resets it to the exact figure.
+    """
+    with _size_lock:
+        path = STORE_FILE
+        if path in _cached_sizes:
+            _cached_sizes[path] += nbytes
+        else:
+            # First write in this process: the count already includes this row
+            _cached_sizes[path] = _cached_bytes(connect())
+        over = _cached_sizes[path] > MAX_CACHE_BYTES
+    if over:
+        evict(int(MAX_CACHE_BYTES * EVICT_TARGET))
+
+
+def evict(max_bytes=None):
+    """Delete the oldest cached HTTP responses until their combined size fits ``max_bytes``."""
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    conn = connect()
+    total = _cached_bytes(conn)
+    if total <= max_bytes:
+        _set_cached_size(total)
+        return 0
+
+    removed = 0
+    with conn:
+        # Take the write lock up front so concurrent workers queue instead of failing
+        conn.execute("BEGIN IMMEDIATE")
+        total = _cached_bytes(conn)
+        rows = conn.execute("SELECT rowid, size FROM http_responses ORDER BY fetched_at").fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if total <= max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= size
+            removed += 1
+        conn.executemany("DELETE FROM http_responses WHERE rowid = ?", doomed)
+    _set_cached_size(total)
+    return removed
+
+
+def _set_cached_size(total):
+    with _size_lock:
+        _cached_sizes[STORE_FILE] = total
+
+
+def _cached_bytes(conn):
+    return conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_responses").fetchone()[0]
+
+
+def stats():
+    conn = connect()
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in TABLES
+    }
+    file_size = os.path.getsize(STORE_FILE) if os.path.exists(STORE_FILE) else 0
+    return {"path": STORE_FILE, "file_size": file_size, "tables": counts}
+
+
+def vacuum():
+    conn = connect()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+
+
+def clear(tables=None):
+    conn = connect()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for table in tables or TABLES:
+            conn.execute(f"DELETE FROM {table}")
+    with _size_lock:
+        _cached_sizes.pop(STORE_FILE, None)
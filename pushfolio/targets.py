@@ -0,0 +1,158 @@
+# pushfolio/targets.py
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from jinja2 import TemplateNotFound
+from . import markdown, metrics, store
+from .output import atomic_write
+
+FORMATS = ("markdown", "html", "json")
+
+# Bump when a renderer's output changes so every target gets rewritten once
+TARGETS_VERSION = 2
+
+
+def _format_for(entry):
+    if entry.get("format"):
+        return entry["format"]
+    template = entry.get("template")
+    if not template:
+        return "json"
+    return "html" if template.endswith((".html", ".htm")) else "markdown"
+
+
+def resolve_targets(settings, output_path):
+    """
+    The README (``template`` → ``output_path``) plus every entry in the ``outputs`` config:
+
+        "outputs": [
+            {"template": "profile.html", "path": "site/index.html"},
+            {"format": "json", "path": "site/profile.json"}
+        ]
+
+    ``format`` is inferred from the template extension; an entry without a template is a JSON snapshot.
+    """
+    targets = [{
+        "format": "markdown",
+        "template": settings.get("template", "default.md"),
+        "path": output_path,
+        "primary": True,
+    }]
+    seen = {os.path.abspath(output_path)}
+
+    for entry in settings.get("outputs") or []:
+        if not isinstance(entry, dict) or not entry.get("path"):
+            continue
+        fmt = _format_for(entry)
+        if fmt not in FORMATS:
+            continue
+        key = os.path.abspath(entry["path"])
+        if key in seen:
+            continue
+        seen.add(key)
+        targets.append({
+            "format": fmt,
+            "template": entry.get("template") if fmt != "json" else None,
+            "path": entry["path"],
+            "primary": False,
+        })
+    return targets
+
+
+def _relink_charts(charts, readme_path, target_path):
+    # Chart paths are relative to the README; re-point them for targets written elsewhere
+    readme_dir = os.path.dirname(os.path.abspath(readme_path))
+    target_dir = os.path.dirname(os.path.abspath(target_path))
+    if readme_dir == target_dir:
+        return charts
+    return {
+        name: os.path.relpath(os.path.join(readme_dir, path), target_dir).replace(os.sep, "/")
+        for name, path in charts.items()
+    }
+
+
+def _template_source(template_file):
+    env = markdown.get_env()
+    try:
+        return env.loader.get_source(env, template_file)[0]
+    except TemplateNotFound:
+        return None
+
+
+def _input_hash(target, context, plugin_sections):
+    payload = json.dumps([
+        TARGETS_VERSION,
+        target["format"],
+        target["template"],
+        _template_source(target["template"]) if target["template"] else None,
+        context,
+        plugin_sections,
+    ], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# 🖨️ Renderers: each yields the target's text in chunks
+
+def _markdown_chunks(target, context, plugin_sections):
+    yield from markdown.stream_template(target["template"], context)
+    if plugin_sections:
+        yield "\n\n" + "\n\n".join(plugin_sections)
+
+
+def _html_chunks(target, context, plugin_sections):
+    yield from markdown.stream_template(target["template"], dict(context, plugin_sections=plugin_sections))
+
+
+def _json_chunks(target, context, plugin_sections):
+    snapshot = dict(context, plugin_sections=plugin_sections)
+    snapshot["generated_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    yield json.dumps(snapshot, indent=2, sort_keys=True, default=str)
+    yield "\n"
+
+
+RENDERERS = {
+    "markdown": _markdown_chunks,
+    "html": _html_chunks,
+    "json": _json_chunks,
+}
+
+
+def target_chunks(target, context, plugin_sections):
+    return RENDERERS[target["format"]](target, context, plugin_sections)
+
+
+def write_target(target, context, plugin_sections, readme_path):
+    """
+    Render one target and write it atomically. Returns "written", "unchanged"
+    (rendered, same bytes) or "skipped" (inputs hash unchanged, not rendered at all).
+    A render error (markdown.TemplateRenderError) propagates and leaves the file as it was.
+    """
+    context = dict(context, charts=_relink_charts(context.get("charts") or {}, readme_path, target["path"]))
+    path = target["path"]
+    key = os.path.abspath(path)
+
+    digest = _input_hash(target, context, plugin_sections)
+    fresh = store.get_output_hash(key) == digest and os.path.exists(path)
+    metrics.record_cache("outputs", fresh)
+    if fresh:
+        return "skipped"
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    try:
+        changed = atomic_write(path, target_chunks(target, context, plugin_sections))
+    except Exception:
+        # Render errors raise (the old file is kept); never let these inputs count as done
+        store.forget_output_hash(key)
+        raise
+    # Only a clean render marks these inputs as written
+    store.put_output_hash(key, digest)
+    return "written" if changed else "unchanged"
+
+
+def templates_for(targets):
+    """Template per target (None for JSON), for markdown.data_plan()."""
+    return [target["template"] for target in targets]
@@ -0,0 +1,75 @@
+from array import array
+from datetime import date
+
+from pushfolio.activity import _streaks, compute_stats
+
+
+def _columns(events):
+    """events: (date, commits, repo) tuples → the array layout load_columns() returns."""
+    repos = []
+    columns = {"days": array("l"), "commits": array("l"), "repo_idx": array("l"), "repos": repos}
+    for day, commits, repo in events:
+        if repo not in repos:
+            repos.append(repo)
+        columns["days"].append(day.toordinal())
+        columns["commits"].append(commits)
+        columns["repo_idx"].append(repos.index(repo))
+    return columns
+
+
+def test_weekly_buckets_start_on_monday():
+    today = date(2026, 10, 15)  # Thursday
+    stats = compute_stats(_columns([
+        (date(2026, 10, 12), 3, "a"),  # Monday this week
+        (date(2026, 10, 11), 2, "a"),  # Sunday last week
+        (date(2026, 10, 5), 1, "b"),   # Monday last week
+    ]), weeks=2, today=today)
+
+    assert [w["week"] for w in stats["weekly_commits"]] == ["05 Oct", "12 Oct"]
+    assert [w["commits"] for w in stats["weekly_commits"]] == [3, 3]
+    assert stats["total_commits"] == 6
+
+
+def test_events_before_the_window_count_in_totals_only():
+    stats = compute_stats(_columns([(date(2026, 1, 1), 5, "a")]), weeks=2, today=date(2026, 10, 15))
+
+    assert [w["commits"] for w in stats["weekly_commits"]] == [0, 0]
+    assert stats["total_commits"] == 5
+
+
+def test_event_after_today_is_ignored():
+    # UTC Monday event while the caller's date is still Sunday
+    stats = compute_stats(_columns([
+        (date(2026, 10, 19), 4, "a"),
+        (date(2026, 10, 18), 1, "a"),
+    ]), weeks=12, today=date(2026, 10, 18))
+
+    assert sum(w["commits"] for w in stats["weekly_commits"]) == 1
+    assert stats["total_events"] == 1
+    assert stats["current_streak"] == 1
+
+
+def test_top_repos_rank_by_commits_then_events():
+    stats = compute_stats(_columns([
+        (date(2026, 10, 12), 1, "few"),
+        (date(2026, 10, 12), 5, "many"),
+        (date(2026, 10, 13), 0, "busy"),
+        (date(2026, 10, 13), 0, "busy"),
+    ]), weeks=1, today=date(2026, 10, 15))
+
+    assert [r["name"] for r in stats["top_repos"]] == ["many", "few", "busy"]
+
+
+def _ordinals(*days):
+    return {date(2026, 10, d).toordinal() for d in days}
+
+
+def test_streaks():
+    today = date(2026, 10, 15).toordinal()
+
+    assert _streaks(_ordinals(13, 14, 15), today) == (3, 3)
+    # Nothing yet today: the streak ending yesterday still counts
+    assert _streaks(_ordinals(13, 14), today) == (2, 2)
+    # A gap before yesterday ends the current streak
+    assert _streaks(_ordinals(1, 2, 3, 4, 13), today) == (0, 4)
+    assert _streaks(set(), today) == (0, 0)
@@ -0,0 +1,25 @@
+from pushfolio.plugin_host import PluginHost
+
+
+def _plugin(tmp_path, name, body):
+    path = tmp_path / f"{name}.py"
+    path.write_text(body, encoding="utf-8")
+    return str(path)
+
+
+def test_crashing_plugin_does_not_take_down_its_neighbours(tmp_path):
+    crash = _plugin(tmp_path, "crash", "import os\n\ndef run(context):\n    os._exit(1)\n")
+    good = _plugin(tmp_path, "good", "def run(context):\n    return 'ok'\n")
+    host = PluginHost(workers=2, cpu_seconds=1)
+    try:
+        results = host.run_many([
+            ("crash", crash, "run", {}),
+            ("good", good, "run", {}),
+        ])
+    finally:
+        host.shutdown()
+
+    assert [r["name"] for r in results] == ["crash", "good"]
+    assert results[0]["error"] == "Plugin worker crashed"
+    assert results[1]["error"] is None
+    assert results[1]["output"] == "ok"